@@ -130,6 +130,7 @@ class Config:
     global_paths: tuple[Path, ...] = ()
     users: MappingProxyType[str, UserConfig] = field(default_factory=lambda: MappingProxyType({}))
     ollama_host: str | None = None
+    ollama_direct_embed: bool = False
     query_log_path: Path | None = None
 
     @property
@@ -434,6 +435,7 @@ def load_config(path: Path | None = None) -> Config:
         global_paths=global_paths,
         users=MappingProxyType(users),
         ollama_host=data.get("ollama_host"),
+        ollama_direct_embed=data.get("ollama_direct_embed", False),
         query_log_path=query_log_path,
     )
 
@@ -4,6 +4,7 @@ Multiple MCP instances share this DB via WAL mode. Documents are keyed
 by SHA-256 hash of file contents so identical files are never converted twice.
 """
 
+import functools
 import json
 import logging
 import sqlite3
@@ -18,6 +19,27 @@ logger = logging.getLogger(__name__)
 _WAL_RETRIES = 5
 _WAL_BASE_DELAY = 0.05
 
+# Content hashes remembered process-wide, reused while a file's size and
+# mtime are unchanged; least recently used entries are dropped past this many
+_HASH_MEMO_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=_HASH_MEMO_SIZE)
+def _memo_file_hash(path: str, size: int, mtime_ns: int) -> str:
+    """Hash *path*; memoised on its (size, mtime_ns) so a changed stat misses."""
+    return _file_hash(Path(path))
+
+
+def _content_hash(path: Path) -> str:
+    """Hash *path*, reusing an earlier hash while its size and mtime are unchanged.
+
+    The memo is shared by every ``DocStore`` in the process, since stores are
+    opened per job or tool call. The stat is taken before reading, so a
+    write that lands mid-hash is keyed on the old stat and rehashed next time.
+    """
+    stat = path.stat()
+    return _memo_file_hash(str(path), stat.st_size, stat.st_mtime_ns)
+
 
 def _set_wal_mode(conn: sqlite3.Connection) -> None:
     """Set WAL journal mode with retry for concurrent first-time access.
@@ -91,6 +113,10 @@ class DocStore:
         self._conn = sqlite3.connect(str(db_path))
         self._conn.execute("PRAGMA busy_timeout=5000")
         _set_wal_mode(self._conn)
+        # WAL keeps the store consistent at NORMAL; a crash can only lose the
+        # last conversions, which are re-run on the next cache miss
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
         self._conn.execute("PRAGMA foreign_keys=ON")
         self._conn.row_factory = sqlite3.Row
         for stmt in _SCHEMA_STATEMENTS:
@@ -141,7 +167,7 @@ class DocStore:
         Returns:
             The (possibly cached) conversion result.
         """
-        content_hash = _file_hash(path)
+        content_hash = _content_hash(path)
 
         # Check for existing source row
         row = self._conn.execute(
@@ -1,8 +1,15 @@
 """Ollama embedding helpers for ragling."""
 
+import functools
 import logging
+import os
+import random
 import struct
-from typing import Any
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, overload
 
 import httpx
 import ollama
@@ -14,10 +21,18 @@ logger = logging.getLogger(__name__)
 # Send at most this many texts per Ollama API call to avoid timeouts
 _BATCH_SIZE = 32
 
+# Attempts for a batch call before falling back to per-text embedding.
+# Transient failures (HTTP 500, read timeouts, memory pressure) often
+# succeed on a later attempt; waits grow as random(1, 2) * 2**attempt seconds.
+_BATCH_RETRIES = 3
+
 # Per-request timeout in seconds — generous because the first call
 # triggers model loading which can take minutes on large models
 _TIMEOUT = 300.0
 
+# Ollama's default port, used when OLLAMA_HOST / ollama_host omits one
+_DEFAULT_OLLAMA_PORT = 11434
+
 
 class OllamaConnectionError(Exception):
     """Raised when Ollama is not reachable."""
@@ -36,6 +51,70 @@ def _client(config: Config) -> ollama.Client:
     return ollama.Client(**kwargs)
 
 
+def _ollama_base_url(config: Config) -> str:
+    """Resolve the Ollama base URL the same way ``ollama.Client`` does.
+
+    ``config.ollama_host`` wins, then the ``OLLAMA_HOST`` environment
+    variable, then localhost. A missing scheme defaults to http and a
+    missing port on an http URL defaults to 11434.
+    """
+    host = config.ollama_host or os.environ.get("OLLAMA_HOST") or "127.0.0.1"
+    url = httpx.URL(host if "://" in host else f"http://{host}")
+    if url.port is None and url.scheme == "http":
+        url = url.copy_with(port=_DEFAULT_OLLAMA_PORT)
+    return str(url).rstrip("/")
+
+
+class _DirectEmbedClient:
+    """Minimal ``/api/embed`` client that skips the ollama SDK.
+
+    The SDK validates every float of the response into a pydantic model
+    before handing it back; for batches of 32 x 1024-dim vectors that
+    validation costs more than the JSON decode itself. This client posts
+    the same request over a plain ``httpx.Client`` and returns the decoded
+    JSON as-is. Errors are raised as ``ollama.ResponseError`` with Ollama's
+    error text so the retry and fallback logic treats both paths alike.
+    One instance is shared per base URL (see ``_direct_client()``) so its
+    pooled keep-alive connections are reused across calls.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        self._http = httpx.Client(base_url=base_url, timeout=httpx.Timeout(_TIMEOUT))
+
+    def embed(self, *, model: str, input: str | list[str]) -> dict[str, Any]:
+        """POST to ``/api/embed`` and return the decoded response body."""
+        response = self._http.post("/api/embed", json={"model": model, "input": input})
+        if response.is_error:
+            try:
+                detail = response.json().get("error", response.text)
+            except ValueError:
+                detail = response.text
+            raise ollama.ResponseError(detail, response.status_code)
+        body: dict[str, Any] = response.json()
+        return body
+
+
+@functools.cache
+def _direct_client(base_url: str) -> _DirectEmbedClient:
+    """Return the process-wide direct client for *base_url*, creating it once."""
+    return _DirectEmbedClient(base_url)
+
+
+_EmbedClient = ollama.Client | _DirectEmbedClient
+
+
+def _embed_client(config: Config) -> _EmbedClient:
+    """Create the client used for embedding calls.
+
+    Returns the shared direct HTTP client for the configured Ollama URL
+    when ``config.ollama_direct_embed`` is set, otherwise the ollama SDK
+    client from ``_client()``.
+    """
+    if config.ollama_direct_embed:
+        return _direct_client(_ollama_base_url(config))
+    return _client(config)
+
+
 def _raise_if_connection_error(e: Exception, *, config: Config) -> None:
     """Re-raise as OllamaConnectionError if the error looks like a connection issue."""
     msg = str(e).lower()
@@ -81,7 +160,7 @@ def _truncate_to_words(text: str, max_words: int = 256) -> str:
     return " ".join(words[:max_words])
 
 
-def _embed_single_with_retry(client: ollama.Client, text: str, *, config: Config) -> list[float]:
+def _embed_single_with_retry(client: _EmbedClient, text: str, *, config: Config) -> list[float]:
     """Embed a single text with one truncation retry on failure.
 
     On the first failure (that is not a connection error), retries once with
@@ -104,18 +183,75 @@ def _embed_single_with_retry(client: ollama.Client, text: str, *, config: Config
         return response["embeddings"][0]
     except Exception as e:
         _raise_if_connection_error(e, config=config)
-        truncated = _truncate_to_words(text)
-        logger.warning(
-            "Embedding failed for text (%d chars), retrying with truncated text (%d chars)",
-            len(text),
-            len(truncated),
-        )
+        return _embed_truncated(client, text, config=config)
+
+
+def _embed_truncated(client: _EmbedClient, text: str, *, config: Config) -> list[float]:
+    """Embed *text* truncated to 256 words, after the full text has failed.
+
+    Args:
+        client: An Ollama client instance.
+        text: The original (untruncated) text.
+        config: Application configuration.
+
+    Returns:
+        Embedding vector as list of floats.
+
+    Raises:
+        OllamaConnectionError: If Ollama is not running or unreachable.
+    """
+    truncated = _truncate_to_words(text)
+    logger.warning(
+        "Embedding failed for text (%d chars), retrying with truncated text (%d chars)",
+        len(text),
+        len(truncated),
+    )
+    try:
+        response = client.embed(model=config.embedding_model, input=truncated)
+        return response["embeddings"][0]
+    except Exception as e:
+        _raise_if_connection_error(e, config=config)
+        raise
+
+
+def _embed_batch_with_backoff(
+    client: _EmbedClient, batch: str | list[str], *, config: Config
+) -> list[list[float]] | None:
+    """Embed a batch, retrying transient failures with exponential backoff.
+
+    NaN errors are deterministic (one bad text poisons the batch), so they
+    skip the backoff and return None immediately.
+
+    Args:
+        client: An Ollama client instance.
+        batch: Texts to embed in one call, or a single text.
+        config: Application configuration.
+
+    Returns:
+        Embedding vectors for the batch, or None if the caller should fall
+        back to embedding each text individually.
+
+    Raises:
+        OllamaConnectionError: If Ollama is not running or unreachable.
+    """
+    for attempt in range(_BATCH_RETRIES):
         try:
-            response = client.embed(model=config.embedding_model, input=truncated)
-            return response["embeddings"][0]
-        except Exception as retry_e:
-            _raise_if_connection_error(retry_e, config=config)
-            raise
+            response = client.embed(model=config.embedding_model, input=batch)
+            return response["embeddings"]
+        except Exception as e:
+            _raise_if_connection_error(e, config=config)
+            if "NaN" in str(e) or attempt == _BATCH_RETRIES - 1:
+                return None
+            delay = random.uniform(1, 2) * (2**attempt)
+            logger.warning(
+                "Batch embed failed (attempt %d/%d): %s — retrying in %.1fs",
+                attempt + 1,
+                _BATCH_RETRIES,
+                e,
+                delay,
+            )
+            time.sleep(delay)
+    return None
 
 
 def get_embedding(text: str, config: Config) -> list[float]:
@@ -134,14 +270,62 @@ def get_embedding(text: str, config: Config) -> list[float]:
     Raises:
         OllamaConnectionError: If Ollama is not running or unreachable.
     """
-    return _embed_single_with_retry(_client(config), text, config=config)
+    return _embed_single_with_retry(_embed_client(config), text, config=config)
+
+
+def get_embeddings_iter(
+    texts: list[str], config: Config, *, batch_size: int = _BATCH_SIZE
+) -> Iterator[list[float]]:
+    """Yield embeddings for *texts* in order, one sub-batch at a time.
+
+    Lets callers persist vectors for one batch while the next is being
+    computed, and avoids holding every vector in memory at once. The Ollama
+    client is created lazily on the first ``next()``.
+
+    Args:
+        texts: List of texts to embed.
+        config: Application configuration.
+        batch_size: Maximum texts per Ollama API call.
+
+    Yields:
+        One embedding vector per input text, in input order.
+
+    Raises:
+        OllamaConnectionError: If Ollama is not running or unreachable.
+    """
+    if not texts:
+        return
+
+    client = _embed_client(config)
+
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start : start + batch_size]
+        if len(texts) > batch_size:
+            logger.info(
+                "Embedding batch %d-%d of %d texts...",
+                start + 1,
+                min(start + batch_size, len(texts)),
+                len(texts),
+            )
+        embeddings = _embed_batch_with_backoff(client, batch, config=config)
+        if embeddings is not None:
+            yield from embeddings
+            continue
+        logger.warning("Batch embed failed, retrying %d texts individually", len(batch))
+        for text in batch:
+            yield _embed_single_with_retry(client, text, config=config)
 
 
 def get_embeddings(texts: list[str], config: Config) -> list[list[float]]:
     """Get embeddings for a batch of texts.
 
     Sends texts in sub-batches to avoid timeouts on large inputs.
-    Logs progress for visibility.
+    Transient batch failures are retried with exponential backoff before
+    falling back to per-text embedding. Logs progress for visibility.
+    A single text is sent as a plain string with the same backoff, and
+    falls straight through to the truncation retry, since re-sending it
+    unchanged as an individual call would only fail again.
+    See ``get_embeddings_iter()`` for the streaming variant.
 
     Args:
         texts: List of texts to embed.
@@ -155,29 +339,72 @@ def get_embeddings(texts: list[str], config: Config) -> list[list[float]]:
     """
     if not texts:
         return []
+    if len(texts) == 1:
+        client = _embed_client(config)
+        embeddings = _embed_batch_with_backoff(client, texts[0], config=config)
+        if embeddings is not None:
+            return embeddings
+        return [_embed_truncated(client, texts[0], config=config)]
+    return list(get_embeddings_iter(texts, config))
+
+
+@overload
+def prefetch_embeddings(
+    batches: Iterable[list[str]], config: Config, *, depth: int = 1
+) -> Iterator[list[list[float]]]: ...
+
+
+@overload
+def prefetch_embeddings[T](
+    batches: Iterable[list[str]],
+    config: Config,
+    *,
+    depth: int = 1,
+    embed: Callable[[list[str], Config], T],
+) -> Iterator[T]: ...
+
+
+def prefetch_embeddings(
+    batches: Iterable[list[str]],
+    config: Config,
+    *,
+    depth: int = 1,
+    embed: Callable[[list[str], Config], Any] = get_embeddings,
+) -> Iterator[Any]:
+    """Embed a stream of batches, keeping *depth* batches in flight ahead of the consumer.
+
+    While the caller persists the embeddings for batch N, Ollama is already
+    working on batch N+1 (up to N+depth). *batches* is advanced on the
+    caller's thread, so producing batch N+1 also overlaps with embedding
+    batch N. Results are yielded in input order. Abandoning the generator
+    cancels batches that have not started yet.
 
-    client = _client(config)
-    all_embeddings: list[list[float]] = []
+    Args:
+        batches: Iterable of text batches; consumed lazily.
+        config: Application configuration.
+        depth: Number of batches to embed ahead of the one being consumed;
+            at most this many embed calls run at once.
+        embed: Called on a helper thread for each batch. Defaults to
+            ``get_embeddings()``; pass a wrapper to change how a failed
+            batch is reported.
 
-    for start in range(0, len(texts), _BATCH_SIZE):
-        batch = texts[start : start + _BATCH_SIZE]
-        if len(texts) > _BATCH_SIZE:
-            logger.info(
-                "Embedding batch %d-%d of %d texts...",
-                start + 1,
-                min(start + _BATCH_SIZE, len(texts)),
-                len(texts),
-            )
-        try:
-            response = client.embed(model=config.embedding_model, input=batch)
-            all_embeddings.extend(response["embeddings"])
-        except Exception as e:
-            _raise_if_connection_error(e, config=config)
-            logger.warning("Batch embed failed, retrying %d texts individually", len(batch))
-            for text in batch:
-                all_embeddings.append(_embed_single_with_retry(client, text, config=config))
+    Yields:
+        What *embed* returns for each batch, in the same order as *batches*.
 
-    return all_embeddings
+    Raises:
+        OllamaConnectionError: If Ollama is not running or unreachable.
+    """
+    pending: deque[Future[Any]] = deque()
+    pool = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="embed-prefetch")
+    try:
+        for batch in batches:
+            pending.append(pool.submit(embed, batch, config))
+            if len(pending) > depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 
 def serialize_float32(vec: list[float]) -> bytes:
@@ -7,6 +7,8 @@ import json
 import logging
 import sqlite3
 from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,13 +16,17 @@ from typing import TYPE_CHECKING
 
 from ragling.document.chunker import Chunk
 from ragling.config import Config
-from ragling.embeddings import serialize_float32
+from ragling.embeddings import get_embeddings, prefetch_embeddings, serialize_float32
 
 if TYPE_CHECKING:
     from ragling.indexing_status import IndexingStatus
 
 logger = logging.getLogger(__name__)
 
+# Parsed files are queued until they hold at least this many chunks, then
+# embedded with one get_embeddings() call (small files are often 1-3 chunks)
+_EMBED_BATCH_CHUNKS = 64
+
 
 def file_hash(path: Path) -> str:
     """Compute SHA256 hash of a file's contents."""
@@ -117,7 +123,9 @@ def upsert_source_with_chunks(
             raise RuntimeError("INSERT INTO sources returned no lastrowid")
         source_id = cursor.lastrowid
 
-    # Insert new documents and vectors
+    # Insert new documents (one at a time, each needs its rowid), then all
+    # vectors in a single executemany
+    vec_rows: list[tuple[bytes, int]] = []
     for chunk, embedding in zip(chunks, embeddings):
         metadata_json = json.dumps(chunk.metadata) if chunk.metadata else None
         doc_cursor = conn.execute(
@@ -127,10 +135,11 @@ def upsert_source_with_chunks(
         )
         if doc_cursor.lastrowid is None:
             raise RuntimeError("INSERT INTO documents returned no lastrowid")
-        doc_id = doc_cursor.lastrowid
-        conn.execute(
+        vec_rows.append((serialize_float32(embedding), doc_cursor.lastrowid))
+    if vec_rows:
+        conn.executemany(
             "INSERT INTO vec_documents (embedding, document_id) VALUES (?, ?)",
-            (serialize_float32(embedding), doc_id),
+            vec_rows,
         )
 
     conn.commit()
@@ -155,39 +164,66 @@ def delete_source(
     Returns:
         True if a source was deleted, False if it didn't exist.
     """
-    existing = conn.execute(
-        "SELECT id FROM sources WHERE collection_id = ? AND source_path = ?",
-        (collection_id, source_path),
-    ).fetchone()
-
-    if not existing:
+    if not delete_sources(conn, collection_id, [source_path]):
         return False
+    logger.info("Deleted source: %s", source_path)
+    return True
 
-    source_id = existing["id"]
 
-    # Delete vectors for all documents of this source
-    old_doc_ids = [
+def delete_sources(
+    conn: sqlite3.Connection,
+    collection_id: int,
+    source_paths: list[str],
+) -> int:
+    """Delete many sources and their documents/vectors in one transaction.
+
+    The paths are bound as a single JSON array and expanded with
+    ``json_each()``, so the statement count does not grow with the number
+    of paths. Paths that don't exist in the collection are ignored.
+
+    Args:
+        conn: SQLite database connection.
+        collection_id: Collection the sources belong to.
+        source_paths: The source_paths to delete.
+
+    Returns:
+        Number of sources deleted.
+    """
+    if not source_paths:
+        return 0
+
+    ids = [
         r["id"]
         for r in conn.execute(
-            "SELECT id FROM documents WHERE source_id = ?", (source_id,)
+            "SELECT id FROM sources WHERE collection_id = ? "
+            "AND source_path IN (SELECT value FROM json_each(?))",
+            (collection_id, json.dumps(source_paths)),
         ).fetchall()
     ]
-    if old_doc_ids:
-        placeholders = ",".join("?" * len(old_doc_ids))
-        conn.execute(
-            f"DELETE FROM vec_documents WHERE document_id IN ({placeholders})",  # noqa: S608 — parameterized placeholders, not user input
-            old_doc_ids,
-        )
+    if not ids:
+        return 0
+    source_ids = json.dumps(ids)
+
+    # Delete vectors for all documents of these sources
+    conn.execute(
+        "DELETE FROM vec_documents WHERE document_id IN ("
+        "SELECT id FROM documents WHERE source_id IN (SELECT value FROM json_each(?)))",
+        (source_ids,),
+    )
 
     # Delete documents (triggers handle FTS cleanup)
-    conn.execute("DELETE FROM documents WHERE source_id = ?", (source_id,))
+    conn.execute(
+        "DELETE FROM documents WHERE source_id IN (SELECT value FROM json_each(?))",
+        (source_ids,),
+    )
 
-    # Delete the source row
-    conn.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+    # Delete the source rows
+    deleted = conn.execute(
+        "DELETE FROM sources WHERE id IN (SELECT value FROM json_each(?))", (source_ids,)
+    ).rowcount
 
     conn.commit()
-    logger.info("Deleted source: %s", source_path)
-    return True
+    return deleted
 
 
 def prune_stale_sources(conn: sqlite3.Connection, collection_id: int) -> int:
@@ -210,12 +246,8 @@ def prune_stale_sources(conn: sqlite3.Connection, collection_id: int) -> int:
         (collection_id,),
     ).fetchall()
 
-    pruned = 0
-    for row in rows:
-        source_path = row["source_path"]
-        if not Path(source_path).exists():
-            delete_source(conn, collection_id, source_path)
-            pruned += 1
+    stale = [row["source_path"] for row in rows if not Path(row["source_path"]).exists()]
+    pruned = delete_sources(conn, collection_id, stale)
 
     if pruned:
         logger.info("Pruned %d stale source(s) from collection %d", pruned, collection_id)
@@ -253,6 +285,198 @@ class IndexResult:
         return ", ".join(parts)
 
 
+@dataclass
+class ParsedFile:
+    """A parsed file whose chunks are waiting to be embedded and stored."""
+
+    display_name: str
+    source_path: str
+    source_type: str
+    chunks: list[Chunk]
+    file_hash: str
+    file_modified_at: str
+    file_size: int
+
+
+def parse_in_batches[K](
+    changed_files: Iterable[tuple[K, str, int]],
+    parse: Callable[[K, str, int], ParsedFile | None],
+    counts: IndexResult,
+    *,
+    collection_name: str,
+    status: IndexingStatus | None = None,
+) -> Iterator[list[ParsedFile]]:
+    """Parse changed files lazily and yield them in embedding-sized batches.
+
+    Files that *parse* skips (returns None) or that raise are counted in
+    *counts* and ticked on *status* immediately; they never reach a batch.
+
+    Args:
+        changed_files: (key, hash, size) tuples from an indexer's scan pass.
+        parse: Indexer callback turning one (key, hash, size) into a
+            ``ParsedFile``, or None to skip the file.
+        counts: Receives the skipped and errors counts.
+        collection_name: Collection name used for progress reporting.
+        status: Optional indexing status tracker for file-level progress.
+
+    Yields:
+        Lists of parsed files holding at least ``_EMBED_BATCH_CHUNKS``
+        chunks, except possibly the last.
+    """
+    pending: list[ParsedFile] = []
+    pending_chunks = 0
+    for key, file_h, file_size in changed_files:
+        try:
+            parsed = parse(key, file_h, file_size)
+        except Exception as e:  # noqa: BLE001 — any parser failure only fails its own file
+            logger.error("Error indexing %s: %s", key, e)
+            parsed = None
+            counts.errors += 1
+        else:
+            if parsed is None:
+                counts.skipped += 1
+        if parsed is None:
+            if status:
+                status.file_processed(collection_name, 1, file_size)
+            continue
+
+        pending.append(parsed)
+        pending_chunks += len(parsed.chunks)
+        if pending_chunks >= _EMBED_BATCH_CHUNKS:
+            yield pending
+            pending = []
+            pending_chunks = 0
+
+    if pending:
+        yield pending
+
+
+def _embed_batch(texts: list[str], config: Config) -> list[list[float]] | None:
+    """Embed every chunk of a batch with one call; None if the call fails."""
+    try:
+        embeddings = get_embeddings(texts, config)
+    except Exception as e:  # noqa: BLE001 — any batch failure falls back to per-file embedding
+        logger.warning("Batch of %d chunks failed to embed (%s), retrying per file", len(texts), e)
+        return None
+    if len(embeddings) != len(texts):
+        logger.warning(
+            "Batch got %d vectors for %d chunks, retrying per file", len(embeddings), len(texts)
+        )
+        return None
+    return embeddings
+
+
+def embed_and_store(
+    conn: sqlite3.Connection,
+    config: Config,
+    collection_id: int,
+    batches: Iterator[list[ParsedFile]],
+    *,
+    collection_name: str,
+    status: IndexingStatus | None = None,
+) -> tuple[int, int]:
+    """Embed batches one ahead with ``prefetch_embeddings()`` and store them here.
+
+    While a helper thread embeds batch N, this thread parses batch N+1 (by
+    advancing *batches*) and writes batch N-1. Parsing, any ``DocStore``
+    access and the connection stay on the calling thread; the helper only
+    makes embedding calls.
+
+    Args:
+        conn: SQLite database connection.
+        config: Application configuration.
+        collection_id: Collection ID to index into.
+        batches: Parsed-file batches, typically from ``parse_in_batches()``.
+        collection_name: Collection name used for progress reporting.
+        status: Optional indexing status tracker for file-level progress.
+
+    Returns:
+        Tuple of (files stored, files that failed).
+    """
+    queued: deque[list[ParsedFile]] = deque()
+
+    def batch_texts() -> Iterator[list[str]]:
+        for batch in batches:
+            queued.append(batch)
+            yield [c.text for f in batch for c in f.chunks]
+
+    stored = 0
+    failed = 0
+    for embeddings in prefetch_embeddings(batch_texts(), config, embed=_embed_batch):
+        ok, bad = _store_batch(
+            conn,
+            config,
+            collection_id,
+            queued.popleft(),
+            embeddings,
+            collection_name=collection_name,
+            status=status,
+        )
+        stored += ok
+        failed += bad
+    return stored, failed
+
+
+def _store_batch(
+    conn: sqlite3.Connection,
+    config: Config,
+    collection_id: int,
+    batch: list[ParsedFile],
+    embeddings: list[list[float]] | None,
+    *,
+    collection_name: str,
+    status: IndexingStatus | None = None,
+) -> tuple[int, int]:
+    """Store each file of an embedded batch.
+
+    If the combined embedding call failed, each file is embedded on its
+    own so one bad file only fails itself.
+
+    Args:
+        conn: SQLite database connection.
+        config: Application configuration.
+        collection_id: Collection ID to index into.
+        batch: Parsed files to store.
+        embeddings: The batch's vectors in chunk order, or None if the
+            batched call failed.
+        collection_name: Collection name used for progress reporting.
+        status: Optional indexing status tracker for file-level progress.
+
+    Returns:
+        Tuple of (files stored, files that failed).
+    """
+    stored = 0
+    failed = 0
+    offset = 0
+    for parsed in batch:
+        n = len(parsed.chunks)
+        try:
+            if embeddings is not None:
+                file_embeddings = embeddings[offset : offset + n]
+            else:
+                file_embeddings = get_embeddings([c.text for c in parsed.chunks], config)
+            upsert_source_with_chunks(
+                conn,
+                collection_id=collection_id,
+                source_path=parsed.source_path,
+                source_type=parsed.source_type,
+                chunks=parsed.chunks,
+                embeddings=file_embeddings,
+                file_hash=parsed.file_hash,
+                file_modified_at=parsed.file_modified_at,
+            )
+            logger.info("Indexed %s [%s] (%d chunks)", parsed.display_name, parsed.source_type, n)
+            stored += 1
+        except Exception as e:  # noqa: BLE001 — one file's failure must not abort its batch
+            logger.error("Error indexing %s: %s", parsed.display_name, e)
+            failed += 1
+        finally:
+            offset += n
+            if status:
+                status.file_processed(collection_name, 1, parsed.file_size)
+    return stored, failed
+
+
 class BaseIndexer(ABC):
     """Abstract base indexer that all source-specific indexers extend."""
 
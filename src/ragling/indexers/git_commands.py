@@ -7,12 +7,21 @@ execute git CLI commands, and return results. No class state dependency.
 from __future__ import annotations
 
 import logging
+import re
 import subprocess
+from collections.abc import Iterator
 from dataclasses import dataclass
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Splits ``git show`` output into per-file sections. Diff body lines always
+# start with +, -, space or backslash, and the commit message is indented,
+# so only real file headers begin a line with "diff --git ".
+_DIFF_HEADER_RE = re.compile(r"^(?=diff --git )", re.MULTILINE)
+# Start of each commit in multi-commit ``git show`` output (SHA-1 or SHA-256)
+_COMMIT_HEADER_RE = re.compile(r"^(?=commit [0-9a-f]{40,64}\b)", re.MULTILINE)
+
 
 @dataclass
 class CommitInfo:
@@ -38,22 +47,32 @@ class FileChange:
 def run_git(repo_path: Path, *args: str) -> subprocess.CompletedProcess[str]:
     """Run a git command in the given repo directory.
 
+    Output is captured as bytes and decoded once as UTF-8 with replacement,
+    rather than in text mode: diffs can contain any file encoding (text mode
+    would raise on the first non-UTF-8 byte), and text mode's universal
+    newline pass would also rewrite CRLF content.
+
     Args:
         repo_path: Path to the git repository.
         *args: Git subcommand and arguments.
 
     Returns:
-        CompletedProcess result.
+        CompletedProcess result with decoded ``stdout``/``stderr``.
 
     Raises:
         subprocess.CalledProcessError: If the git command fails.
     """
-    return subprocess.run(
+    result = subprocess.run(
         ["git", "-C", str(repo_path), *args],
         capture_output=True,
-        text=True,
         check=True,
     )
+    return subprocess.CompletedProcess(
+        result.args,
+        result.returncode,
+        result.stdout.decode("utf-8", "replace"),
+        result.stderr.decode("utf-8", "replace"),
+    )
 
 
 def is_git_repo(repo_path: Path) -> bool:
@@ -71,16 +90,21 @@ def get_head_sha(repo_path: Path) -> str:
     return result.stdout.strip()
 
 
+def _split_nul(output: str) -> list[str]:
+    """Split ``-z`` output into paths (verbatim, never C-quoted by git)."""
+    return [path for path in output.split("\0") if path]
+
+
 def git_ls_files(repo_path: Path) -> list[str]:
     """List all tracked files in the repo."""
-    result = run_git(repo_path, "ls-files")
-    return [line for line in result.stdout.strip().split("\n") if line]
+    result = run_git(repo_path, "ls-files", "-z")
+    return _split_nul(result.stdout)
 
 
 def git_diff_names(repo_path: Path, from_sha: str, to_sha: str = "HEAD") -> list[str]:
     """Get list of files changed between two commits."""
-    result = run_git(repo_path, "diff", "--name-only", f"{from_sha}..{to_sha}")
-    return [line for line in result.stdout.strip().split("\n") if line]
+    result = run_git(repo_path, "diff", "--name-only", "-z", f"{from_sha}..{to_sha}")
+    return _split_nul(result.stdout)
 
 
 def commit_exists(repo_path: Path, sha: str) -> bool:
@@ -156,9 +180,13 @@ def get_commit_file_changes(repo_path: Path, commit_sha: str) -> list[FileChange
     except subprocess.CalledProcessError as e:
         logger.warning("Failed to get file changes for %s: %s", commit_sha[:12], e)
         return []
+    return _parse_numstat(result.stdout)
+
 
+def _parse_numstat(output: str) -> list[FileChange]:
+    """Parse ``--numstat`` lines into FileChange objects."""
     changes: list[FileChange] = []
-    for line in result.stdout.strip().split("\n"):
+    for line in output.strip().split("\n"):
         if not line:
             continue
         parts = line.split("\t", 2)
@@ -195,3 +223,101 @@ def get_file_diff(repo_path: Path, commit_sha: str, file_path: str) -> str:
     except subprocess.CalledProcessError as e:
         logger.warning("Failed to get diff for %s in %s: %s", file_path, commit_sha[:12], e)
         return ""
+
+
+def get_commit_file_diffs(repo_path: Path, commit_sha: str) -> dict[str, str]:
+    """Get every file's diff for a commit from a single ``git show`` call.
+
+    Each value is exactly what ``get_file_diff()`` returns for that path
+    (the commit header followed by that file's diff), but the commit costs
+    one git process instead of one per file.
+
+    Only sections whose header is the plain ``diff --git a/<path> b/<path>``
+    form are keyed; renamed or quoted paths are left out so callers can
+    fall back to ``get_file_diff()`` for them.
+
+    Args:
+        repo_path: Path to the git repository.
+        commit_sha: The commit SHA.
+
+    Returns:
+        Mapping of file path to diff text, or an empty dict on failure.
+    """
+    try:
+        result = run_git(repo_path, "show", commit_sha)
+    except subprocess.CalledProcessError as e:
+        logger.warning("Failed to get diffs for %s: %s", commit_sha[:12], e)
+        return {}
+    return _split_file_diffs(result.stdout)
+
+
+def _split_file_diffs(show_output: str) -> dict[str, str]:
+    """Key one commit's ``git show`` output by file (see ``get_commit_file_diffs()``)."""
+    header, *sections = _DIFF_HEADER_RE.split(show_output)
+    diffs: dict[str, str] = {}
+    for section in sections:
+        first_line = section.partition("\n")[0]
+        a_path, sep, b_path = first_line.removeprefix("diff --git a/").partition(" b/")
+        if sep and a_path == b_path:
+            diffs[a_path] = header + section
+    return diffs
+
+
+def _show_commit_batch(
+    repo_path: Path, batch: list[str]
+) -> tuple[dict[str, list[FileChange]], dict[str, dict[str, str]]]:
+    """Run the two batched ``git show`` calls and split their output per commit."""
+    numstat = run_git(repo_path, "show", "--numstat", "--format=%x00%H", *batch)
+    shown = run_git(repo_path, "show", *batch)
+
+    changes: dict[str, list[FileChange]] = {}
+    for record in numstat.stdout.split("\0")[1:]:
+        sha, _, body = record.partition("\n")
+        changes[sha] = _parse_numstat(body)
+
+    diffs: dict[str, dict[str, str]] = {}
+    sections = _COMMIT_HEADER_RE.split(shown.stdout)[1:]
+    for i, section in enumerate(sections):
+        # git separates consecutive commits with one blank line that a
+        # single-commit ``git show`` doesn't print
+        if i < len(sections) - 1:
+            section = section.removesuffix("\n")
+        sha = section[len("commit ") :].split(maxsplit=1)[0]
+        diffs[sha] = _split_file_diffs(section)
+    return changes, diffs
+
+
+def iter_commit_file_data(
+    repo_path: Path, commit_shas: list[str], *, batch_size: int = 64
+) -> Iterator[tuple[list[FileChange], dict[str, str]]]:
+    """Yield each commit's file changes and per-file diffs, in order.
+
+    Equivalent to calling ``get_commit_file_changes()`` and
+    ``get_commit_file_diffs()`` for every SHA, but runs two git processes
+    per *batch_size* commits instead of two per commit. If a batched call
+    fails or its output cannot be parsed (e.g. a SHA has gone missing),
+    that batch falls back to the per-commit helpers.
+
+    Args:
+        repo_path: Path to the git repository.
+        commit_shas: Full commit SHAs to inspect.
+        batch_size: Maximum commits per git invocation.
+
+    Yields:
+        ``(file_changes, file_diffs)`` for each SHA in *commit_shas*.
+    """
+    for start in range(0, len(commit_shas), batch_size):
+        batch = commit_shas[start : start + batch_size]
+        try:
+            changes, diffs = _show_commit_batch(repo_path, batch)
+        except Exception as e:  # noqa: BLE001 — any git or parse failure retries per commit
+            logger.warning("Batched git show failed (%s), falling back per commit", e)
+            for sha in batch:
+                yield (
+                    get_commit_file_changes(repo_path, sha),
+                    get_commit_file_diffs(repo_path, sha),
+                )
+            continue
+
+        for sha in batch:
+            yield changes.get(sha, []), diffs.get(sha, {})
@@ -8,8 +8,10 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 import sqlite3
 from datetime import datetime, timezone
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -23,21 +25,25 @@ from ragling.embeddings import get_embeddings
 from ragling.indexers.base import (
     BaseIndexer,
     IndexResult,
-    delete_source,
+    ParsedFile,
+    delete_sources,
+    embed_and_store,
     file_hash,
+    parse_in_batches,
     upsert_source_with_chunks,
 )
 from ragling.indexers.git_commands import (
     CommitInfo,
     FileChange,
     commit_exists,
-    get_commit_file_changes,
+    get_commit_file_diffs,
     get_commits_since,
     get_file_diff,
     get_head_sha,
     git_diff_names,
     git_ls_files,
     is_git_repo,
+    iter_commit_file_data,
 )
 from ragling.parsers.code import (
     CodeDocument,
@@ -83,6 +89,7 @@ def _commit_to_chunks(
     file_changes: list[FileChange],
     repo_path: Path,
     config: Config,
+    commit_diffs: dict[str, str] | None = None,
 ) -> list[Chunk]:
     """Convert a commit and its file changes into chunks for embedding.
 
@@ -94,6 +101,8 @@ def _commit_to_chunks(
         file_changes: List of file changes in the commit.
         repo_path: Path to the repository.
         config: Application configuration.
+        commit_diffs: Per-file diffs already fetched for this commit (see
+            ``iter_commit_file_data()``); fetched here when omitted.
 
     Returns:
         List of Chunk objects.
@@ -106,12 +115,18 @@ def _commit_to_chunks(
     short_sha = commit.sha[:7]
     # Extract date portion from ISO format
     date_str = commit.author_date[:10]
+    # One git process for the whole commit; get_file_diff() covers paths the
+    # batched output can't key (renames, quoted names).
+    if commit_diffs is None:
+        commit_diffs = get_commit_file_diffs(repo_path, commit.sha)
 
     for fc in file_changes:
         if fc.is_binary:
             continue
 
-        diff_text = get_file_diff(repo_path, commit.sha, fc.file_path)
+        diff_text = commit_diffs.get(fc.file_path)
+        if diff_text is None:
+            diff_text = get_file_diff(repo_path, commit.sha, fc.file_path)
         if not diff_text:
             continue
 
@@ -160,18 +175,26 @@ def _commit_to_chunks(
     return chunks
 
 
+def _compile_exclude_re(patterns: set[str]) -> re.Pattern[str]:
+    """Fold the exclude patterns into a single regex.
+
+    A directory pattern (trailing ``/``) matches any non-final path segment
+    equal to it; a file pattern matches the final segment exactly.
+    """
+    dirs = sorted(re.escape(p[:-1]) for p in patterns if p.endswith("/"))
+    files = sorted(re.escape(p) for p in patterns if not p.endswith("/"))
+    return re.compile(rf"(?:^|/)(?:(?:{'|'.join(dirs)})/|(?:{'|'.join(files)})$)")
+
+
+_EXCLUDE_RE = _compile_exclude_re(_EXCLUDE_PATTERNS)
+
+
+# The same paths recur at every commit of a history walk; the function is
+# pure, so memoizing the verdict is safe across repos and threads.
+@lru_cache(maxsize=8192)
 def _should_exclude(relative_path: str) -> bool:
     """Check if a file should be excluded based on hardcoded patterns."""
-    for pattern in _EXCLUDE_PATTERNS:
-        if pattern.endswith("/"):
-            # Directory pattern
-            if f"/{pattern}" in f"/{relative_path}" or relative_path.startswith(pattern):
-                return True
-        else:
-            # File pattern
-            if relative_path == pattern or relative_path.endswith(f"/{pattern}"):
-                return True
-    return False
+    return _EXCLUDE_RE.search(relative_path) is not None
 
 
 def _code_blocks_to_chunks(
@@ -315,6 +338,15 @@ class GitRepoIndexer(BaseIndexer):
         self.repo_path = repo_path.resolve()
         self.collection_name = collection_name
 
+    def _source_path(self, relative_path: str) -> str:
+        """Return the source_path stored for a tracked file.
+
+        ``repo_path`` is resolved once in ``__init__``, so a plain join is
+        already canonical; resolving each file again would cost an lstat per
+        path component and would collapse a tracked symlink onto its target.
+        """
+        return str(self.repo_path / relative_path)
+
     def index(
         self,
         conn: sqlite3.Connection,
@@ -367,6 +399,7 @@ class GitRepoIndexer(BaseIndexer):
                         collection_id,
                         force,
                         config.git_history_in_months,
+                        watermarks,
                         status=status,
                     )
                 return IndexResult(total_found=0, skipped=0)
@@ -397,9 +430,8 @@ class GitRepoIndexer(BaseIndexer):
             files_to_index = git_ls_files(self.repo_path)
 
         # Clean up deleted files from DB
-        for rel_path in files_to_delete:
-            source_path = str(self.repo_path / rel_path)
-            delete_source(conn, collection_id, source_path)
+        if files_to_delete:
+            delete_sources(conn, collection_id, [self._source_path(p) for p in files_to_delete])
 
         # Filter to supported code files
         indexable = [f for f in files_to_index if self._should_index(f)]
@@ -424,7 +456,7 @@ class GitRepoIndexer(BaseIndexer):
                 continue
             file_h = file_hash(file_path)
             if not force:
-                source_path = str(file_path.resolve())
+                source_path = self._source_path(rel_path)
                 row = conn.execute(
                     "SELECT id, file_hash FROM sources WHERE collection_id = ? AND source_path = ?",
                     (collection_id, source_path),
@@ -440,30 +472,30 @@ class GitRepoIndexer(BaseIndexer):
             total_bytes = sum(size for _, _, size in changed_files)
             status.set_file_total(self.collection_name, len(changed_files), total_bytes)
 
-        # Index pass: process changed files with per-file status ticks
+        # Index pass: parse changed files into multi-file batches on this thread
+        # while the previous batch is embedded in the background; files are
+        # stored (and ticked) on this thread once their batch's vectors are back.
         # Shared cache avoids redundant SPEC.md walks for files in the same directory
         spec_cache: dict[str, str | None] = {}
-        for rel_path, file_h, file_size in changed_files:
-            try:
-                was_indexed = self._index_file(
-                    conn,
-                    config,
-                    rel_path,
-                    collection_id,
-                    force,
-                    precomputed_hash=file_h,
-                    spec_cache=spec_cache,
-                )
-                if was_indexed:
-                    indexed += 1
-                else:
-                    skipped += 1
-            except Exception as e:
-                logger.error("Error indexing %s: %s", rel_path, e)
-                errors += 1
-            finally:
-                if status:
-                    status.file_processed(self.collection_name, 1, file_size)
+        parse_result = IndexResult()
+        batches = parse_in_batches(
+            changed_files,
+            partial(self._parse_file, config, spec_cache=spec_cache),
+            parse_result,
+            collection_name=self.collection_name,
+            status=status,
+        )
+        stored, failed = embed_and_store(
+            conn,
+            config,
+            collection_id,
+            batches,
+            collection_name=self.collection_name,
+            status=status,
+        )
+        indexed += stored
+        skipped += parse_result.skipped
+        errors += parse_result.errors + failed
 
         # Update watermark for this repo in the shared dict
         watermarks[repo_key] = head_sha
@@ -492,6 +524,7 @@ class GitRepoIndexer(BaseIndexer):
                 collection_id,
                 force,
                 config.git_history_in_months,
+                watermarks,
                 status=status,
             )
             return IndexResult(
@@ -510,48 +543,31 @@ class GitRepoIndexer(BaseIndexer):
         path = Path(relative_path)
         return is_code_file(path) or is_spec_file(path)
 
-    def _index_file(
+    def _parse_file(
         self,
-        conn: sqlite3.Connection,
         config: Config,
         relative_path: str,
-        collection_id: int,
-        force: bool,
-        precomputed_hash: str | None = None,
+        file_h: str,
+        file_size: int,
         spec_cache: dict[str, str | None] | None = None,
-    ) -> bool:
-        """Index a single file from the repository.
+    ) -> ParsedFile | None:
+        """Parse and chunk a single file from the repository.
 
         Args:
-            conn: SQLite database connection.
             config: Application configuration.
             relative_path: Path relative to the repository root.
-            collection_id: Collection ID to index into.
-            force: If True, re-index regardless of change detection.
-            precomputed_hash: Pre-computed SHA256 hash (avoids recomputation
-                when the scan pass already computed it).
+            file_h: SHA256 hash computed by the scan pass.
+            file_size: File size in bytes, for progress reporting.
             spec_cache: Shared cache for spec_path lookups across files.
 
         Returns:
-            True if the file was indexed, False if skipped (unchanged).
+            The parsed file ready for embedding, or None if it was skipped
+            (missing, unsupported language, or no content).
         """
         file_path = self.repo_path / relative_path
         if not file_path.exists():
             logger.warning("File not found: %s", file_path)
-            return False
-
-        source_path = str(file_path.resolve())
-        file_h = precomputed_hash or file_hash(file_path)
-
-        # Check if already indexed with same hash (skip when hash was pre-checked)
-        if not force and precomputed_hash is None:
-            row = conn.execute(
-                "SELECT id, file_hash FROM sources WHERE collection_id = ? AND source_path = ?",
-                (collection_id, source_path),
-            ).fetchone()
-            if row and row["file_hash"] == file_h:
-                logger.debug("Unchanged, skipping: %s", relative_path)
-                return False
+            return None
 
         # Route SPEC.md files to the dedicated spec parser
         if is_spec_file(file_path):
@@ -563,12 +579,12 @@ class GitRepoIndexer(BaseIndexer):
             language = get_language(file_path)
             if not language:
                 logger.debug("No language detected for %s, skipping", relative_path)
-                return False
+                return None
 
             doc = parse_code_file(file_path, language, relative_path)
             if not doc or not doc.blocks:
                 logger.warning("No content extracted from %s, skipping", relative_path)
-                return False
+                return None
 
             chunks = _code_blocks_to_chunks(
                 doc, relative_path, config, repo_root=self.repo_path, spec_cache=spec_cache
@@ -577,26 +593,18 @@ class GitRepoIndexer(BaseIndexer):
 
         if not chunks:
             logger.warning("File parsed but produced 0 chunks: %s", relative_path)
-            return False
-
-        # Generate embeddings
-        texts = [c.text for c in chunks]
-        embeddings = get_embeddings(texts, config)
+            return None
 
         mtime = datetime.fromtimestamp(file_path.stat().st_mtime, tz=timezone.utc).isoformat()
-
-        upsert_source_with_chunks(
-            conn,
-            collection_id=collection_id,
-            source_path=source_path,
+        return ParsedFile(
+            display_name=relative_path,
+            source_path=self._source_path(relative_path),
             source_type=source_type,
             chunks=chunks,
-            embeddings=embeddings,
             file_hash=file_h,
             file_modified_at=mtime,
+            file_size=file_size,
         )
-        logger.info("Indexed %s (%d chunks)", relative_path, len(chunks))
-        return True
 
     def _index_history(
         self,
@@ -605,6 +613,7 @@ class GitRepoIndexer(BaseIndexer):
         collection_id: int,
         force: bool,
         months: int,
+        watermarks: dict[str, str],
         *,
         status: IndexingStatus | None = None,
     ) -> IndexResult:
@@ -619,6 +628,8 @@ class GitRepoIndexer(BaseIndexer):
             collection_id: Collection ID to index into.
             force: If True, re-index all history regardless of watermark.
             months: How many months of history to index.
+            watermarks: The collection's parsed watermarks, as already read by
+                ``index()``; updated in place and written back once.
 
         Returns:
             IndexResult summarizing the history indexing run.
@@ -626,12 +637,6 @@ class GitRepoIndexer(BaseIndexer):
         repo_key = str(self.repo_path)
         history_key = f"{repo_key}:history"
 
-        # Read existing watermarks
-        row = conn.execute(
-            "SELECT description FROM collections WHERE id = ?", (collection_id,)
-        ).fetchone()
-        watermarks = _parse_watermarks(row["description"] if row else None)
-
         since_sha = watermarks.get(history_key) if not force else None
 
         # If forcing, delete all existing commit sources for this repo
@@ -709,14 +714,25 @@ class GitRepoIndexer(BaseIndexer):
         if status and commits_to_index:
             status.set_file_total(self.collection_name, len(commits_to_index), 0)
 
+        # Two git processes per batch of commits rather than two per commit
+        shas = [c.sha for c in commits_to_index]
+        commit_data = iter_commit_file_data(self.repo_path, shas)
         for i, commit in enumerate(commits_to_index, 1):
             try:
-                file_changes = get_commit_file_changes(self.repo_path, commit.sha)
+                try:
+                    file_changes, commit_diffs = next(commit_data)
+                except Exception:
+                    # A generator that raised is finished; resume after this commit
+                    commit_data = iter_commit_file_data(self.repo_path, shas[i:])
+                    raise
+
                 if not file_changes:
                     skipped += 1
                     continue
 
-                chunks = _commit_to_chunks(commit, file_changes, self.repo_path, config)
+                chunks = _commit_to_chunks(
+                    commit, file_changes, self.repo_path, config, commit_diffs
+                )
                 if not chunks:
                     skipped += 1
                     continue
@@ -14,6 +14,7 @@ from __future__ import annotations
 import logging
 import sqlite3
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -28,13 +29,14 @@ if TYPE_CHECKING:
 from ragling.document.chunker import Chunk as _Chunk  # noqa: F401
 
 from ragling.db import get_or_create_collection
-from ragling.embeddings import get_embeddings
 from ragling.indexers.base import (
     BaseIndexer,
     IndexResult,
+    ParsedFile,
+    embed_and_store,
     file_hash,
+    parse_in_batches,
     prune_stale_sources,
-    upsert_source_with_chunks,
 )
 from ragling.indexers.format_routing import (
     EXTENSION_MAP,
@@ -154,7 +156,9 @@ class ProjectIndexer(BaseIndexer):
         """Index a list of files into a given collection.
 
         Uses a two-pass approach: first scans for changed files (fast hash
-        check), then indexes only the changed files with per-file progress.
+        check), then parses only the changed files and embeds their chunks in
+        multi-file batches (one batch ahead on a helper thread), ticking
+        progress per file as each is stored.
         """
         total_found = len(files)
         indexed = 0
@@ -188,22 +192,28 @@ class ProjectIndexer(BaseIndexer):
             total_bytes = sum(size for _, _, size in changed_files)
             status.set_file_total(self.collection_name, len(changed_files), total_bytes)
 
-        # Index pass: process changed files with per-file status ticks
-        for file_path, file_h, file_size in changed_files:
-            try:
-                was_indexed = self._index_file(
-                    conn, config, file_path, collection_id, force, precomputed_hash=file_h
-                )
-                if was_indexed:
-                    indexed += 1
-                else:
-                    skipped += 1
-            except Exception as e:
-                logger.error("Error indexing %s: %s", file_path, e)
-                errors += 1
-            finally:
-                if status:
-                    status.file_processed(self.collection_name, 1, file_size)
+        # Index pass: parse changed files into multi-file batches on this thread
+        # while the previous batch is embedded in the background; files are
+        # stored (and ticked) on this thread once their batch's vectors are back.
+        parse_result = IndexResult()
+        batches = parse_in_batches(
+            changed_files,
+            partial(self._parse_file, config),
+            parse_result,
+            collection_name=self.collection_name,
+            status=status,
+        )
+        stored, failed = embed_and_store(
+            conn,
+            config,
+            collection_id,
+            batches,
+            collection_name=self.collection_name,
+            status=status,
+        )
+        indexed += stored
+        skipped += parse_result.skipped
+        errors += parse_result.errors + failed
 
         return IndexResult(indexed=indexed, skipped=skipped, errors=errors, total_found=total_found)
 
@@ -236,35 +246,32 @@ class ProjectIndexer(BaseIndexer):
             return IndexResult()
         return self._index_files(conn, config, doc_files, collection_id, force)
 
-    def _index_file(
+    def _parse_file(
         self,
-        conn: sqlite3.Connection,
         config: Config,
         file_path: Path,
-        collection_id: int,
-        force: bool,
-        precomputed_hash: str | None = None,
-    ) -> bool:
-        """Index a single file into the collection."""
+        file_h: str,
+        file_size: int,
+    ) -> ParsedFile | None:
+        """Parse and chunk a single file.
+
+        Args:
+            config: Application configuration.
+            file_path: File to parse.
+            file_h: SHA256 hash computed by the scan pass.
+            file_size: File size in bytes, for progress reporting.
+
+        Returns:
+            The parsed file ready for embedding, or None if no content was
+            extracted.
+        """
         source_path = str(file_path.resolve())
-        file_h = precomputed_hash or file_hash(file_path)
         ext = file_path.suffix.lower()
         if is_spec_file(file_path):
             source_type = "spec"
         else:
             source_type = EXTENSION_MAP.get(ext, "plaintext")
 
-        # Check if already indexed with same hash (skip when hash was pre-checked)
-        if not force and precomputed_hash is None:
-            row = conn.execute(
-                "SELECT id, file_hash FROM sources WHERE collection_id = ? AND source_path = ?",
-                (collection_id, source_path),
-            ).fetchone()
-            if row and row["file_hash"] == file_h:
-                logger.debug("Unchanged, skipping: %s", file_path)
-                return False
-
-        # Parse and chunk
         chunks = parse_and_chunk(
             file_path,
             source_type,
@@ -274,22 +281,15 @@ class ProjectIndexer(BaseIndexer):
         )
         if not chunks:
             logger.warning("No content extracted from %s, skipping", file_path)
-            return False
-
-        # Generate embeddings
-        texts = [c.text for c in chunks]
-        embeddings = get_embeddings(texts, config)
+            return None
 
         mtime = datetime.fromtimestamp(file_path.stat().st_mtime, tz=timezone.utc).isoformat()
-        upsert_source_with_chunks(
-            conn,
-            collection_id=collection_id,
+        return ParsedFile(
+            display_name=str(file_path),
             source_path=source_path,
             source_type=source_type,
             chunks=chunks,
-            embeddings=embeddings,
             file_hash=file_h,
             file_modified_at=mtime,
+            file_size=file_size,
         )
-        logger.info("Indexed %s [%s] (%d chunks)", file_path, source_type, len(chunks))
-        return True
@@ -16,7 +16,9 @@ import logging
 import queue
 import sqlite3
 import threading
-from collections.abc import Iterator
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -34,7 +36,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IndexJob:
     """A unit of indexing work to be processed by the worker thread.
 
@@ -60,13 +62,12 @@ class IndexJob:
 class IndexRequest:
     """Wrapper for synchronous job submission with completion signaling.
 
-    Wraps an IndexJob with a threading.Event for blocking until the
-    worker completes processing, and a result slot for the IndexResult.
+    Wraps an IndexJob with a Future that the worker resolves with the
+    IndexResult, or with the exception the job raised.
     """
 
     job: IndexJob
-    done: threading.Event = field(default_factory=threading.Event)
-    result: IndexResult | None = None
+    future: Future[IndexResult | None] = field(default_factory=Future)
 
 
 class IndexingQueue:
@@ -86,6 +87,13 @@ class IndexingQueue:
         self._config = config
         self._status = status
         self._worker = threading.Thread(target=self._run, name="index-worker", daemon=True)
+        # Jobs submitted but not yet picked up by the worker, for coalescing
+        self._pending: set[IndexJob] = set()
+        self._pending_lock = threading.Lock()
+        # Index DB connection reused across jobs; only the worker touches it.
+        # Reopened when set_config() swaps in a new Config.
+        self._conn: sqlite3.Connection | None = None
+        self._conn_config: Config | None = None
 
     def start(self) -> None:
         """Start the worker thread."""
@@ -94,14 +102,53 @@ class IndexingQueue:
     def submit(self, job: IndexJob) -> None:
         """Add a job to the queue.
 
-        Increments the indexing status counter immediately.
+        Increments the indexing status counter immediately. A job equal to
+        one still waiting in the queue is dropped: the queued job has not
+        started yet, so it will see the same changes when it runs. A prune
+        job ends coalescing for its collection, so jobs submitted after it
+        always run after it.
 
         Args:
             job: The indexing job to enqueue.
         """
+        if not self._claim_pending([job]):
+            logger.debug("Coalesced duplicate pending job: %s", job)
+            return
         self._queue.put(job)
         self._status.increment(job.collection_name)
 
+    def submit_many(self, jobs: Iterable[IndexJob]) -> None:
+        """Add several jobs to the queue, preserving their order.
+
+        Status counters are incremented once per collection rather than
+        once per job. Duplicates are coalesced as in :meth:`submit`.
+
+        Args:
+            jobs: The indexing jobs to enqueue.
+        """
+        jobs = self._claim_pending(jobs)
+        for collection, count in Counter(job.collection_name for job in jobs).items():
+            self._status.increment(collection, count)
+        for job in jobs:
+            self._queue.put(job)
+
+    def _claim_pending(self, jobs: Iterable[IndexJob]) -> list[IndexJob]:
+        """Mark *jobs* as pending and return those that were not already pending."""
+        fresh: list[IndexJob] = []
+        with self._pending_lock:
+            for job in jobs:
+                if job.indexer_type == IndexerType.PRUNE:
+                    # Jobs queued ahead of a prune run before it, so they must
+                    # not absorb resubmissions made after it (edit, delete,
+                    # recreate would otherwise end with the file pruned)
+                    self._pending = {
+                        p for p in self._pending if p.collection_name != job.collection_name
+                    }
+                if job not in self._pending:
+                    self._pending.add(job)
+                    fresh.append(job)
+        return fresh
+
     def submit_and_wait(self, job: IndexJob, timeout: float = 300) -> IndexResult | None:
         """Submit a job and block until it completes.
 
@@ -116,15 +163,17 @@ class IndexingQueue:
         Note:
             On timeout the job remains in the queue and will still be
             processed by the worker; only the result is discarded. If the
-            worker raises during processing, the done event is still set
-            and this method returns None.
+            worker raises during processing, the future still resolves
+            (the worker has already logged the error) and this method
+            returns None.
         """
         request = IndexRequest(job=job)
         self._queue.put(request)
         self._status.increment(job.collection_name)
-        if request.done.wait(timeout=timeout):
-            return request.result
-        return None
+        try:
+            return request.future.result(timeout=timeout)
+        except Exception:  # noqa: BLE001 — timeout, or a job error the worker logged
+            return None
 
     def set_config(self, config: Config) -> None:
         """Replace the current config.
@@ -147,23 +196,38 @@ class IndexingQueue:
             item = self._queue.get()
             if item is None:
                 break
+            self._handle(item)
+        self._close_conn()
 
-            if isinstance(item, IndexRequest):
-                job = item.job
-            else:
-                job = item
+    def _handle(self, item: IndexJob | IndexRequest) -> None:
+        """Process one dequeued item, recording failures and settling its status.
 
-            try:
-                result = self._process(job)
-                if isinstance(item, IndexRequest):
-                    item.result = result
-            except Exception:
-                logger.exception("Indexing failed: %s", job)
-                self._status.record_failure(job.collection_name, str(job))
-            finally:
-                self._status.decrement(job.collection_name)
-                if isinstance(item, IndexRequest):
-                    item.done.set()
+        Exceptions from :meth:`_process` are logged and recorded, never
+        raised, so the worker loop keeps going.
+        """
+        if isinstance(item, IndexRequest):
+            job = item.job
+        else:
+            job = item
+            # Picked up: a later identical submit must queue a fresh run
+            with self._pending_lock:
+                self._pending.discard(job)
+
+        result: IndexResult | None = None
+        error: Exception | None = None
+        try:
+            result = self._process(job)
+        except Exception as e:
+            error = e
+            logger.exception("Indexing failed: %s", job)
+            self._status.record_failure(job.collection_name, str(job))
+        finally:
+            self._status.decrement(job.collection_name)
+            if isinstance(item, IndexRequest):
+                if error is None:
+                    item.future.set_result(result)
+                else:
+                    item.future.set_exception(error)
 
     # Types that need a DocStore for Docling document conversion
     _DOCSTORE_TYPES = frozenset(
@@ -198,13 +262,36 @@ class IndexingQueue:
 
     @contextmanager
     def _open_conn(self) -> Iterator[sqlite3.Connection]:
-        """Open an initialized DB connection, closing it on exit."""
-        conn = get_connection(self._config)
-        init_db(conn, self._config)
+        """Yield the worker's initialized DB connection, opening it on first use.
+
+        The connection is kept open across jobs so each job skips
+        extension loading, pragmas and schema checks. It is reopened
+        after :meth:`set_config` replaces the config, since the DB path
+        or embedding dimensions may have changed. Uncommitted writes are
+        rolled back when the job ends, whether it raised or returned, so
+        they never leak into the next job's commit.
+        """
+        config = self._config
+        if self._conn is None or self._conn_config is not config:
+            self._close_conn()
+            conn = get_connection(config)
+            init_db(conn, config)
+            self._conn, self._conn_config = conn, config
         try:
-            yield conn
-        finally:
-            conn.close()
+            yield self._conn
+        except BaseException:
+            self._conn.rollback()
+            raise
+        if self._conn.in_transaction:
+            logger.warning("Job left uncommitted writes; rolling them back")
+            self._conn.rollback()
+
+    def _close_conn(self) -> None:
+        """Close the cached worker connection, if one is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self._conn_config = None
 
     @contextmanager
     def _open_conn_and_docstore(self) -> Iterator[tuple[sqlite3.Connection, DocStore]]:
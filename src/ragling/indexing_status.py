@@ -1,8 +1,12 @@
 """Thread-safe indexing status tracker with per-collection file counts."""
 
 import threading
+from collections import defaultdict, deque
 from typing import Any
 
+# Most recent failure messages kept per collection; older ones are dropped
+_MAX_FAILURES_PER_COLLECTION = 100
+
 
 class IndexingStatus:
     """Tracks remaining files to index, broken down by collection.
@@ -17,11 +21,13 @@ class IndexingStatus:
     Thread-safe. All public methods acquire the internal lock.
     """
 
+    __slots__ = ("_counts", "_failures", "_file_counts", "_lock")
+
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._counts: dict[str, int] = {}
+        self._counts: defaultdict[str, int] = defaultdict(int)
         self._file_counts: dict[str, dict[str, int]] = {}
-        self._failures: dict[str, list[str]] = {}
+        self._failures: dict[str, deque[str]] = {}
 
     def increment(self, collection: str, count: int = 1) -> None:
         """Increment remaining count for a collection.
@@ -31,7 +37,7 @@ class IndexingStatus:
             count: Number of files to add (default 1).
         """
         with self._lock:
-            self._counts[collection] = self._counts.get(collection, 0) + count
+            self._counts[collection] += count
 
     def decrement(self, collection: str, count: int = 1) -> None:
         """Decrement remaining count for a collection.
@@ -58,12 +64,17 @@ class IndexingStatus:
     def record_failure(self, collection: str, message: str) -> None:
         """Record an indexing failure for a collection.
 
+        Only the most recent 100 messages per collection are kept.
+
         Args:
             collection: Collection name.
             message: Human-readable error message.
         """
         with self._lock:
-            self._failures.setdefault(collection, []).append(message)
+            failures = self._failures.get(collection)
+            if failures is None:
+                failures = self._failures[collection] = deque(maxlen=_MAX_FAILURES_PER_COLLECTION)
+            failures.append(message)
 
     def set_file_total(self, collection: str, total: int, total_bytes: int = 0) -> None:
         """Set the total file count and byte size for a collection.
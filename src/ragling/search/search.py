@@ -115,9 +115,8 @@ def _vector_search(
         """
         SELECT document_id, distance
         FROM vec_documents
-        WHERE embedding MATCH ?
+        WHERE embedding MATCH ? AND k = ?
         ORDER BY distance
-        LIMIT ?
         """,
         (query_blob, _candidate_limit(top_k, filters)),
     ).fetchall()
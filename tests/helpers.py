@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import sqlite3
+import tempfile
 from pathlib import Path
 from typing import Any
 
@@ -11,10 +12,47 @@ from ragling.db import get_connection, init_db
 
 EMBED_DIM = 4
 
+# Shared starting point for test configs; each test only swaps in its paths
+_BASE_TEST_CONFIG = Config(embedding_dimensions=EMBED_DIM)
+
+# Bytes of a freshly initialized test DB, built on first use. Copying them
+# is cheaper than replaying the schema DDL for every test.
+_DB_TEMPLATE_BYTES: bytes | None = None
+
+
+def _db_template_bytes() -> bytes:
+    """Return the bytes of an empty, initialized test DB, building it once."""
+    global _DB_TEMPLATE_BYTES
+    if _DB_TEMPLATE_BYTES is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = make_test_config(Path(tmp))
+            conn = get_connection(config)
+            init_db(conn, config)
+            # Fold the WAL into the main file so read_bytes() sees the schema
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.close()
+            _DB_TEMPLATE_BYTES = config.db_path.read_bytes()
+    return _DB_TEMPLATE_BYTES
+
 
 def make_test_conn(tmp_path: Path) -> sqlite3.Connection:
-    """Create an initialized test DB with small embedding dimensions."""
+    """Create an initialized test DB with small embedding dimensions.
+
+    A new DB is copied from a template built once per session; an existing
+    one at the same path is opened and initialized in place.
+    """
     config = make_test_config(tmp_path)
+    if config.db_path.exists():
+        conn = get_connection(config)
+        init_db(conn, config)
+        return conn
+    config.db_path.write_bytes(_db_template_bytes())
+    return get_connection(config)
+
+
+def make_test_mem_conn() -> sqlite3.Connection:
+    """Create an initialized in-memory test DB, for tests that never reopen it."""
+    config = _BASE_TEST_CONFIG.with_overrides(db_path=Path(":memory:"))
     conn = get_connection(config)
     init_db(conn, config)
     return conn
@@ -25,12 +63,7 @@ def make_test_config(tmp_path: Path, **overrides: Any) -> Config:
 
     Accepts keyword overrides for any Config field.
     """
-    defaults: dict[str, Any] = {
-        "db_path": tmp_path / "test.db",
-        "embedding_dimensions": EMBED_DIM,
-    }
-    defaults.update(overrides)
-    return Config(**defaults)
+    return _BASE_TEST_CONFIG.with_overrides(db_path=tmp_path / "test.db", **overrides)
 
 
 def fake_embeddings(texts: list[str], config: Config) -> list[list[float]]:
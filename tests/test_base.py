@@ -114,6 +114,28 @@ class TestUpsertSourceWithChunks:
         assert docs[0]["content"] == "chunk 0"
         assert docs[1]["content"] == "chunk 1"
 
+    def test_each_vector_links_to_its_document(self, db_conn: sqlite3.Connection) -> None:
+        from ragling.embeddings import serialize_float32
+
+        cid = _coll_id(db_conn)
+        embeddings = _make_embeddings(3)
+        sid = upsert_source_with_chunks(
+            db_conn,
+            collection_id=cid,
+            source_path="/test/file.txt",
+            source_type="plaintext",
+            chunks=_make_chunks(3),
+            embeddings=embeddings,
+        )
+        rows = db_conn.execute(
+            "SELECT d.chunk_index, v.embedding FROM documents d "
+            "JOIN vec_documents v ON v.document_id = d.id "
+            "WHERE d.source_id = ? ORDER BY d.chunk_index",
+            (sid,),
+        ).fetchall()
+        assert [r["chunk_index"] for r in rows] == [0, 1, 2]
+        assert [r["embedding"] for r in rows] == [serialize_float32(e) for e in embeddings]
+
     def test_updates_existing_source_with_hash(self, db_conn: sqlite3.Connection) -> None:
         cid = _coll_id(db_conn)
         sid1 = upsert_source_with_chunks(
@@ -1,12 +1,22 @@
-"""Tests for ragling.indexers.base module -- delete and prune functions."""
+"""Tests for ragling.indexers.base module -- delete, prune and batch pipeline functions."""
 
 import sqlite3
+import threading
 from pathlib import Path
+from unittest.mock import MagicMock
 
-from tests.helpers import make_test_conn
+import pytest
+
+from tests.helpers import fake_embeddings, make_test_config, make_test_conn
+from ragling.config import Config
+from ragling.document.chunker import Chunk
 from ragling.indexers.base import (
     IndexResult,
+    ParsedFile,
     delete_source,
+    delete_sources,
+    embed_and_store,
+    parse_in_batches,
     prune_stale_sources,
     upsert_source_with_chunks,
 )
@@ -71,6 +81,36 @@ class TestDeleteSource:
         assert remaining["source_path"] == "/tmp/keep.txt"
 
 
+class TestDeleteSources:
+    def test_deletes_all_listed_sources_and_vectors(self, tmp_path: Path) -> None:
+        conn = make_test_conn(tmp_path)
+        from ragling.db import get_or_create_collection
+
+        cid = get_or_create_collection(conn, "test-coll", "project")
+        for name in ("a", "b", "keep"):
+            _insert_source(conn, cid, f"/tmp/{name}.txt")
+
+        deleted = delete_sources(conn, cid, ["/tmp/a.txt", "/tmp/b.txt", "/tmp/missing.txt"])
+
+        assert deleted == 2
+        paths = [r["source_path"] for r in conn.execute("SELECT source_path FROM sources")]
+        assert paths == ["/tmp/keep.txt"]
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0] == 1
+
+    def test_only_touches_the_given_collection(self, tmp_path: Path) -> None:
+        conn = make_test_conn(tmp_path)
+        from ragling.db import get_or_create_collection
+
+        cid = get_or_create_collection(conn, "test-coll", "project")
+        other = get_or_create_collection(conn, "other-coll", "project")
+        _insert_source(conn, other, "/tmp/shared.txt")
+
+        assert delete_sources(conn, cid, ["/tmp/shared.txt"]) == 0
+        assert delete_sources(conn, cid, []) == 0
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 1
+
+
 class TestPruneStaleSources:
     def test_prunes_source_whose_file_is_gone(
         self, tmp_path: Path
@@ -230,3 +270,131 @@ class TestPruneEndToEnd:
         # The remaining source is the one whose file still exists
         remaining = conn.execute("SELECT source_path FROM sources").fetchone()
         assert remaining["source_path"] == str(files[1])
+
+
+def _parsed(name: str, n_chunks: int) -> ParsedFile:
+    """Build a ParsedFile whose chunk texts start with *name*."""
+    return ParsedFile(
+        display_name=name,
+        source_path=f"/tmp/{name}",
+        source_type="plaintext",
+        chunks=[Chunk(text=f"{name} {i}", title=name, chunk_index=i) for i in range(n_chunks)],
+        file_hash=f"hash-{name}",
+        file_modified_at="2026-01-01T00:00:00+00:00",
+        file_size=10,
+    )
+
+
+class TestParseInBatches:
+    def test_cuts_a_batch_once_it_reaches_the_chunk_threshold(self) -> None:
+        files = [(f"f{i}", "h", 10) for i in range(5)]
+        batches = list(
+            parse_in_batches(
+                files,
+                lambda name, h, size: _parsed(name, 30),
+                IndexResult(),
+                collection_name="coll",
+            )
+        )
+        # 30 + 30 < 64, so the third file closes the first batch
+        assert [[f.display_name for f in b] for b in batches] == [
+            ["f0", "f1", "f2"],
+            ["f3", "f4"],
+        ]
+
+    def test_skipped_and_failed_files_are_counted_and_ticked(self) -> None:
+        def parse(name: str, h: str, size: int) -> ParsedFile | None:
+            if name == "empty":
+                return None
+            if name == "broken":
+                raise ValueError("bad file")
+            return _parsed(name, 1)
+
+        counts = IndexResult()
+        status = MagicMock()
+        files = [("ok", "h", 10), ("empty", "h", 20), ("broken", "h", 30)]
+        batches = list(
+            parse_in_batches(files, parse, counts, collection_name="coll", status=status)
+        )
+
+        assert [[f.display_name for f in b] for b in batches] == [["ok"]]
+        assert (counts.skipped, counts.errors) == (1, 1)
+        status.file_processed.assert_any_call("coll", 1, 20)
+        status.file_processed.assert_any_call("coll", 1, 30)
+
+
+class TestEmbedAndStore:
+    @pytest.fixture()
+    def conn(self, tmp_path: Path) -> sqlite3.Connection:
+        from ragling.db import get_or_create_collection
+
+        conn = make_test_conn(tmp_path)
+        get_or_create_collection(conn, "coll", "project")
+        return conn
+
+    @pytest.fixture()
+    def config(self, tmp_path: Path) -> Config:
+        return make_test_config(tmp_path)
+
+    def _store(
+        self, conn: sqlite3.Connection, config: Config, batches: list[list[ParsedFile]]
+    ) -> tuple[int, int]:
+        return embed_and_store(conn, config, 1, iter(batches), collection_name="coll")
+
+    def _stored_names(self, conn: sqlite3.Connection) -> set[str]:
+        return {
+            Path(r["source_path"]).name for r in conn.execute("SELECT source_path FROM sources")
+        }
+
+    def test_one_embed_call_per_batch_off_the_calling_thread(
+        self, conn: sqlite3.Connection, config: Config, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        calls: list[tuple[str, list[str]]] = []
+
+        def recording(texts: list[str], config: Config) -> list[list[float]]:
+            calls.append((threading.current_thread().name, texts))
+            return fake_embeddings(texts, config)
+
+        monkeypatch.setattr("ragling.indexers.base.get_embeddings", recording)
+        batches = [[_parsed("a", 2), _parsed("b", 1)], [_parsed("c", 1)]]
+
+        assert self._store(conn, config, batches) == (3, 0)
+        assert [texts for _, texts in calls] == [["a 0", "a 1", "b 0"], ["c 0"]]
+        assert all(name.startswith("embed-prefetch") for name, _ in calls)
+        vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        assert vec_count == 4
+
+    def test_failed_batch_falls_back_per_file(
+        self, conn: sqlite3.Connection, config: Config, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A text that cannot be embedded only fails its own file."""
+
+        def rejecting_b(texts: list[str], config: Config) -> list[list[float]]:
+            if any(t.startswith("b") for t in texts):
+                raise RuntimeError("cannot embed")
+            return fake_embeddings(texts, config)
+
+        monkeypatch.setattr("ragling.indexers.base.get_embeddings", rejecting_b)
+        batches = [[_parsed("a", 1), _parsed("b", 1), _parsed("c", 1)]]
+
+        assert self._store(conn, config, batches) == (2, 1)
+        assert self._stored_names(conn) == {"a", "c"}
+
+    def test_vector_count_mismatch_falls_back_per_file(
+        self, conn: sqlite3.Connection, config: Config, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """A short batch response is not sliced across files; each file is re-embedded."""
+        mock = MagicMock(
+            side_effect=[
+                [[0.1, 0.2, 0.3, 0.4]],  # batch of 3 chunks, 1 vector
+                fake_embeddings(["a 0", "a 1"], config),
+                fake_embeddings(["b 0"], config),
+            ]
+        )
+        monkeypatch.setattr("ragling.indexers.base.get_embeddings", mock)
+
+        assert self._store(conn, config, [[_parsed("a", 2), _parsed("b", 1)]]) == (2, 0)
+        assert mock.call_count == 3
+        assert self._stored_names(conn) == {"a", "b"}
+        vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        assert vec_count == 3
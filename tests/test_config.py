@@ -335,6 +335,15 @@ class TestOllamaHostConfig:
         config = load_config(config_file)
         assert config.ollama_host is None
 
+    def test_direct_embed_defaults_off(self) -> None:
+        assert Config().ollama_direct_embed is False
+
+    def test_loads_ollama_direct_embed_from_json(self, tmp_path: Path) -> None:
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"ollama_direct_embed": True}))
+        config = load_config(config_file)
+        assert config.ollama_direct_embed is True
+
 
 class TestEnrichmentConfig:
     """Tests for EnrichmentConfig dataclass and load_config integration."""
@@ -88,6 +88,28 @@ class TestBusyTimeout:
             conn.close()
 
 
+class TestWritePragmas:
+    """Tests for the write-path tuning pragmas on connections."""
+
+    def test_synchronous_normal_and_memory_temp_store(self, tmp_path: Path) -> None:
+        from ragling.db import get_connection
+
+        config = Config(
+            group_name="pragma-test",
+            group_db_dir=tmp_path / "groups",
+            embedding_dimensions=4,
+        )
+        conn = get_connection(config)
+        try:
+            # synchronous: 1 == NORMAL; temp_store: 2 == MEMORY
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        finally:
+            conn.close()
+
+
 class TestInitDbThroughGroupConnection:
     """Tests for init_db working through per-group connections."""
 
@@ -1,13 +1,16 @@
 """Tests for ragling.doc_store module."""
 
+import os
 import sqlite3
 import threading
+from collections.abc import Iterator
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from ragling.doc_store import DocStore
+from ragling.doc_store import DocStore, _memo_file_hash
+from ragling.indexers.base import file_hash as _file_hash
 
 
 @pytest.fixture
@@ -176,6 +179,49 @@ class TestConfigHashCaching:
         assert result == {"text": "data"}
 
 
+class TestDocStoreHashMemo:
+    """Tests for reusing content hashes of files whose stat is unchanged."""
+
+    @pytest.fixture(autouse=True)
+    def _clear_memo(self) -> Iterator[None]:
+        _memo_file_hash.cache_clear()
+        yield
+        _memo_file_hash.cache_clear()
+
+    def test_unchanged_file_is_hashed_once(self, store: DocStore, sample_file: Path) -> None:
+        converter = MagicMock(return_value={"text": "data"})
+        with patch("ragling.doc_store._file_hash", wraps=_file_hash) as mock_hash:
+            store.get_or_convert(sample_file, converter)
+            store.get_or_convert(sample_file, converter)
+        assert mock_hash.call_count == 1
+        assert converter.call_count == 1
+
+    def test_memo_shared_across_stores(self, tmp_path: Path, sample_file: Path) -> None:
+        """A store opened for a later job reuses the hash from an earlier one."""
+        converter = MagicMock(return_value={"text": "data"})
+        with patch("ragling.doc_store._file_hash", wraps=_file_hash) as mock_hash:
+            for _ in range(2):
+                store = DocStore(tmp_path / "shared.sqlite")
+                store.get_or_convert(sample_file, converter)
+                store.close()
+        assert mock_hash.call_count == 1
+        assert converter.call_count == 1
+
+    def test_same_size_rewrite_with_new_mtime_is_rehashed(
+        self, store: DocStore, sample_file: Path
+    ) -> None:
+        converter = MagicMock(side_effect=lambda p: {"text": p.read_text()})
+        store.get_or_convert(sample_file, converter)
+
+        mtime_ns = sample_file.stat().st_mtime_ns
+        sample_file.write_text("Hello, WORLD!")
+        os.utime(sample_file, ns=(mtime_ns + 1_000_000, mtime_ns + 1_000_000))
+
+        result = store.get_or_convert(sample_file, converter)
+        assert result == {"text": "Hello, WORLD!"}
+        assert converter.call_count == 2
+
+
 class TestDocStoreBusyTimeout:
     """Tests for PRAGMA busy_timeout on DocStore connections."""
 
@@ -186,6 +232,16 @@ class TestDocStoreBusyTimeout:
         assert row[0] == 5000
 
 
+class TestDocStoreSynchronous:
+    """Tests for PRAGMA synchronous on DocStore connections."""
+
+    def test_synchronous_is_normal(self, tmp_path: Path) -> None:
+        store = DocStore(tmp_path / "doc_store.sqlite")
+        row = store._conn.execute("PRAGMA synchronous").fetchone()
+        assert row[0] == 1  # NORMAL
+        store.close()
+
+
 class TestMultiProcessSafety:
     """Tests for multi-process write safety."""
 
@@ -1,6 +1,8 @@
 """Tests for ragling.embeddings module."""
 
-from unittest.mock import MagicMock, patch
+import threading
+from collections.abc import Iterator
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -8,45 +10,67 @@ from ragling.config import Config
 from ragling.embeddings import (
     OllamaConnectionError,
     _client,
+    _direct_client,
+    _ollama_base_url,
     _raise_if_connection_error,
     check_connection,
     get_embedding,
     get_embeddings,
+    get_embeddings_iter,
+    prefetch_embeddings,
 )
 
 
+@pytest.fixture()
+def mock_ollama_client(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace ollama.Client with a MagicMock; tests configure ``.return_value``."""
+    fake = MagicMock()
+    monkeypatch.setattr("ragling.embeddings.ollama.Client", fake)
+    return fake
+
+
+@pytest.fixture()
+def mock_sleep(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace time.sleep so backoff retries run instantly."""
+    fake = MagicMock()
+    monkeypatch.setattr("ragling.embeddings.time.sleep", fake)
+    return fake
+
+
+@pytest.fixture()
+def config() -> Config:
+    """Config with tiny embeddings for tests that feed fake vectors."""
+    return Config(embedding_dimensions=2)
+
+
 class TestCheckConnection:
     """check_connection() verifies Ollama is reachable."""
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_succeeds_when_ollama_reachable(self, mock_client_cls: MagicMock) -> None:
+    def test_succeeds_when_ollama_reachable(self, mock_ollama_client: MagicMock) -> None:
         """No exception when client.list() succeeds."""
         config = Config()
         check_connection(config)  # Should not raise
-        mock_client_cls.return_value.list.assert_called_once()
+        mock_ollama_client.return_value.list.assert_called_once()
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_raises_when_ollama_unreachable(  # Tests Core FAIL-1
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock
     ) -> None:
         """Raises OllamaConnectionError when client.list() fails with connection error."""
-        mock_client_cls.return_value.list.side_effect = ConnectionError("connection refused")
+        mock_ollama_client.return_value.list.side_effect = ConnectionError("connection refused")
         config = Config()
         with pytest.raises(OllamaConnectionError, match="Cannot connect to Ollama"):
             check_connection(config)
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_raises_with_remote_host_in_message(self, mock_client_cls: MagicMock) -> None:
+    def test_raises_with_remote_host_in_message(self, mock_ollama_client: MagicMock) -> None:
         """Error message includes the configured remote host."""
-        mock_client_cls.return_value.list.side_effect = ConnectionError("connection refused")
+        mock_ollama_client.return_value.list.side_effect = ConnectionError("connection refused")
         config = Config(ollama_host="http://gpu-box:11434")
         with pytest.raises(OllamaConnectionError, match="gpu-box:11434"):
             check_connection(config)
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_non_connection_error_propagates(self, mock_client_cls: MagicMock) -> None:
+    def test_non_connection_error_propagates(self, mock_ollama_client: MagicMock) -> None:
         """Non-connection errors (e.g. auth) propagate as-is, not wrapped."""
-        mock_client_cls.return_value.list.side_effect = RuntimeError("auth failed")
+        mock_ollama_client.return_value.list.side_effect = RuntimeError("auth failed")
         config = Config()
         with pytest.raises(RuntimeError, match="auth failed"):
             check_connection(config)
@@ -55,25 +79,22 @@ class TestCheckConnection:
 class TestClientHostConfig:
     """_client() passes ollama_host to ollama.Client when configured."""
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_no_host_when_ollama_host_is_none(self, mock_client_cls: MagicMock) -> None:
+    def test_no_host_when_ollama_host_is_none(self, mock_ollama_client: MagicMock) -> None:
         config = Config()
         _client(config)
-        call_kwargs = mock_client_cls.call_args[1]
+        call_kwargs = mock_ollama_client.call_args[1]
         assert "host" not in call_kwargs
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_passes_host_when_ollama_host_set(self, mock_client_cls: MagicMock) -> None:
+    def test_passes_host_when_ollama_host_set(self, mock_ollama_client: MagicMock) -> None:
         config = Config(ollama_host="http://gpu-box:11434")
         _client(config)
-        call_kwargs = mock_client_cls.call_args[1]
+        call_kwargs = mock_ollama_client.call_args[1]
         assert call_kwargs["host"] == "http://gpu-box:11434"
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_always_passes_timeout(self, mock_client_cls: MagicMock) -> None:
+    def test_always_passes_timeout(self, mock_ollama_client: MagicMock) -> None:
         config = Config()
         _client(config)
-        call_kwargs = mock_client_cls.call_args[1]
+        call_kwargs = mock_ollama_client.call_args[1]
         assert "timeout" in call_kwargs
 
 
@@ -96,22 +117,21 @@ class TestHostAwareErrorMessages:
 class TestGetEmbeddingsBatchFallback:
     """get_embeddings() falls back to individual embedding on batch failure."""
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_successful_batch_unchanged(self, mock_client_cls: MagicMock) -> None:
+    def test_successful_batch_unchanged(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
         """Happy path: batch succeeds, returns embeddings directly."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         mock_client.embed.return_value = {"embeddings": [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]}
-        config = Config(embedding_dimensions=2)
         result = get_embeddings(["a", "b", "c"], config)
         assert result == [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
         assert mock_client.embed.call_count == 1
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_batch_failure_retries_individually(
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock, config: Config
     ) -> None:  # Tests Core INV-9
         """Batch of 3 fails, individual calls succeed, returns 3 embeddings."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
 
         # First call (batch) fails, then 3 individual calls succeed
         mock_client.embed.side_effect = [
@@ -120,17 +140,15 @@ class TestGetEmbeddingsBatchFallback:
             {"embeddings": [[3.0, 4.0]]},
             {"embeddings": [[5.0, 6.0]]},
         ]
-        config = Config(embedding_dimensions=2)
         result = get_embeddings(["a", "b", "c"], config)
         assert result == [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]
         assert mock_client.embed.call_count == 4  # 1 batch + 3 individual
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_individual_failure_retries_with_truncated_text(
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock, config: Config
     ) -> None:
         """Batch fails, individual fails, truncated retry succeeds."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         long_text = " ".join(["word"] * 300)  # 300 words, will be truncated to 256
         truncated = " ".join(["word"] * 256)
 
@@ -139,22 +157,21 @@ class TestGetEmbeddingsBatchFallback:
             RuntimeError("json: unsupported value: NaN"),
             RuntimeError("json: unsupported value: NaN"),
             {"embeddings": [[1.0, 2.0]]},
+            {"embeddings": [[3.0, 4.0]]},
         ]
-        config = Config(embedding_dimensions=2)
-        result = get_embeddings([long_text], config)
-        assert result == [[1.0, 2.0]]
-        # 3 calls: batch, individual full text, individual truncated
-        assert mock_client.embed.call_count == 3
+        result = get_embeddings([long_text, "short"], config)
+        assert result == [[1.0, 2.0], [3.0, 4.0]]
+        # 4 calls: batch, individual full text, individual truncated, second text
+        assert mock_client.embed.call_count == 4
         # The third call should use truncated text
         third_call_input = mock_client.embed.call_args_list[2][1]["input"]
         assert third_call_input == truncated
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_individual_failure_raises_when_truncated_retry_also_fails(
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock, config: Config
     ) -> None:
         """Batch fails, individual fails, truncated retry also fails → raises."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
 
         # Batch fails, individual fails, truncated retry also fails
         mock_client.embed.side_effect = [
@@ -162,57 +179,160 @@ class TestGetEmbeddingsBatchFallback:
             RuntimeError("first individual failure"),
             RuntimeError("truncated retry also failed"),
         ]
-        config = Config(embedding_dimensions=2)
         with pytest.raises(RuntimeError, match="truncated retry also failed"):
-            get_embeddings(["some text here"], config)
+            get_embeddings(["some text here", "more"], config)
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_connection_error_in_batch_still_raises(self, mock_client_cls: MagicMock) -> None:
+    def test_connection_error_in_batch_still_raises(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
         """Batch fails with connection error → raises immediately, no retry."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         mock_client.embed.side_effect = ConnectionError("connection refused")
 
-        config = Config(embedding_dimensions=2)
         with pytest.raises(OllamaConnectionError):
             get_embeddings(["a", "b", "c"], config)
         assert mock_client.embed.call_count == 1  # no individual retries
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_connection_error_in_individual_retry_still_raises(
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock, config: Config
     ) -> None:
         """Batch fails (non-connection), individual retry hits connection error."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
 
         # Batch fails with NaN error, first individual retry hits connection error
         mock_client.embed.side_effect = [
             RuntimeError("json: unsupported value: NaN"),
             ConnectionError("connection refused"),
         ]
-        config = Config(embedding_dimensions=2)
         with pytest.raises(OllamaConnectionError):
             get_embeddings(["a", "b", "c"], config)
 
+    def test_transient_batch_error_retried_then_succeeds(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:
+        """Transient batch failure is retried as a batch, not split into singles."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("server error (status code: 500)"),
+            {"embeddings": [[1.0, 2.0], [3.0, 4.0]]},
+        ]
+        result = get_embeddings(["a", "b"], config)
+        assert result == [[1.0, 2.0], [3.0, 4.0]]
+        assert mock_client.embed.call_count == 2
+        assert mock_client.embed.call_args_list[1][1]["input"] == ["a", "b"]
+        mock_sleep.assert_called_once()
+        assert 1.0 <= mock_sleep.call_args[0][0] <= 2.0
+
+    def test_persistent_batch_error_falls_back_after_retries(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:  # Tests Core INV-7
+        """Batch keeps failing → backoff exhausted, then per-text fallback."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("server error (status code: 500)"),
+            RuntimeError("server error (status code: 500)"),
+            RuntimeError("server error (status code: 500)"),
+            {"embeddings": [[1.0, 2.0]]},
+            {"embeddings": [[3.0, 4.0]]},
+        ]
+        result = get_embeddings(["a", "b"], config)
+        assert result == [[1.0, 2.0], [3.0, 4.0]]
+        assert mock_client.embed.call_count == 5  # 3 batch attempts + 2 individual
+        assert mock_sleep.call_count == 2  # no sleep after the final attempt
+
+    def test_nan_error_skips_backoff(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:
+        """NaN errors are deterministic, so they go straight to the fallback."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("json: unsupported value: NaN"),
+            {"embeddings": [[1.0, 2.0]]},
+            {"embeddings": [[3.0, 4.0]]},
+        ]
+        get_embeddings(["a", "b"], config)
+        mock_sleep.assert_not_called()
+
+
+class TestGetEmbeddingsShortInput:
+    """get_embeddings() short-circuits empty and single-text input."""
+
+    def test_empty_input_makes_no_calls(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
+        assert get_embeddings([], config) == []
+        assert mock_ollama_client.return_value.embed.call_count == 0
+
+    def test_single_text_sent_as_plain_string(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
+        """One text takes the get_embedding() path: no batch list, no fan-out."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.return_value = {"embeddings": [[1.0, 2.0]]}
+        assert get_embeddings(["hello"], config) == [[1.0, 2.0]]
+        assert mock_client.embed.call_count == 1
+        assert mock_client.embed.call_args[1]["input"] == "hello"
+
+    def test_single_text_failure_goes_straight_to_truncation(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:
+        """No redundant re-send of the same text as a one-item batch."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("json: unsupported value: NaN"),
+            {"embeddings": [[1.0, 2.0]]},
+        ]
+        assert get_embeddings(["hello"], config) == [[1.0, 2.0]]
+        assert mock_client.embed.call_count == 2
+
+    def test_single_text_transient_error_backs_off(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:
+        """The single-text fast path keeps the batch path's backoff."""
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("server error (status code: 500)"),
+            RuntimeError("server error (status code: 500)"),
+            {"embeddings": [[1.0, 2.0]]},
+        ]
+        assert get_embeddings(["a"], config) == [[1.0, 2.0]]
+        assert mock_client.embed.call_count == 3
+        assert mock_sleep.call_count == 2
+        assert all(c[1]["input"] == "a" for c in mock_client.embed.call_args_list)
+
+    def test_single_text_truncated_after_backoff_exhausted(
+        self, mock_ollama_client: MagicMock, mock_sleep: MagicMock, config: Config
+    ) -> None:
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            RuntimeError("server error (status code: 500)"),
+            RuntimeError("server error (status code: 500)"),
+            RuntimeError("server error (status code: 500)"),
+            {"embeddings": [[1.0, 2.0]]},
+        ]
+        assert get_embeddings(["a"], config) == [[1.0, 2.0]]
+        assert mock_client.embed.call_count == 4  # 3 attempts + 1 truncated
+        assert mock_sleep.call_count == 2
+
 
 class TestGetEmbeddingTruncationRetry:
     """get_embedding() retries with truncated text on failure."""
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_successful_embedding_not_retried(self, mock_client_cls: MagicMock) -> None:
+    def test_successful_embedding_not_retried(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
         """Successful embedding returns directly without retry."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         mock_client.embed.return_value = {"embeddings": [[1.0, 2.0]]}
-        config = Config(embedding_dimensions=2)
         result = get_embedding("hello world", config)
         assert result == [1.0, 2.0]
         assert mock_client.embed.call_count == 1
 
-    @patch("ragling.embeddings.ollama.Client")
     def test_failure_retries_with_truncated_text(
-        self, mock_client_cls: MagicMock
+        self, mock_ollama_client: MagicMock, config: Config
     ) -> None:  # Tests Core INV-9
         """First call fails, retries with text truncated to 256 words."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         long_text = " ".join(["word"] * 300)
         truncated = " ".join(["word"] * 256)
 
@@ -220,7 +340,6 @@ class TestGetEmbeddingTruncationRetry:
             RuntimeError("embedding failed"),
             {"embeddings": [[1.0, 2.0]]},
         ]
-        config = Config(embedding_dimensions=2)
         result = get_embedding(long_text, config)
         assert result == [1.0, 2.0]
         assert mock_client.embed.call_count == 2
@@ -228,39 +347,170 @@ class TestGetEmbeddingTruncationRetry:
         second_call_input = mock_client.embed.call_args_list[1][1]["input"]
         assert second_call_input == truncated
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_short_text_still_retried_on_failure(self, mock_client_cls: MagicMock) -> None:
+    def test_short_text_still_retried_on_failure(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
         """Text under 256 words still gets retried (same text since truncation is a no-op)."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         short_text = "hello world"
 
         mock_client.embed.side_effect = [
             RuntimeError("embedding failed"),
             {"embeddings": [[1.0, 2.0]]},
         ]
-        config = Config(embedding_dimensions=2)
         result = get_embedding(short_text, config)
         assert result == [1.0, 2.0]
         assert mock_client.embed.call_count == 2
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_both_attempts_fail_raises(self, mock_client_cls: MagicMock) -> None:
+    def test_both_attempts_fail_raises(self, mock_ollama_client: MagicMock, config: Config) -> None:
         """Both full and truncated attempts fail → raises exception (no zero vector)."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         mock_client.embed.side_effect = [
             RuntimeError("first failure"),
             RuntimeError("second failure"),
         ]
-        config = Config(embedding_dimensions=2)
         with pytest.raises(RuntimeError, match="second failure"):
             get_embedding("some text", config)
 
-    @patch("ragling.embeddings.ollama.Client")
-    def test_connection_error_raises_immediately(self, mock_client_cls: MagicMock) -> None:
+    def test_connection_error_raises_immediately(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
         """Connection error on first attempt raises immediately, no truncation retry."""
-        mock_client = mock_client_cls.return_value
+        mock_client = mock_ollama_client.return_value
         mock_client.embed.side_effect = ConnectionError("connection refused")
-        config = Config(embedding_dimensions=2)
         with pytest.raises(OllamaConnectionError):
             get_embedding("some text", config)
         assert mock_client.embed.call_count == 1  # No retry attempted
+
+
+class TestGetEmbeddingsIter:
+    """get_embeddings_iter() yields vectors batch by batch."""
+
+    def test_iter_yields_lazily(self, mock_ollama_client: MagicMock, config: Config) -> None:
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = [
+            {"embeddings": [[1.0, 2.0]]},
+            {"embeddings": [[3.0, 4.0]]},
+        ]
+        it = get_embeddings_iter(["a", "b"], config, batch_size=1)
+        assert mock_client.embed.call_count == 0
+        assert next(it) == [1.0, 2.0]
+        assert mock_client.embed.call_count == 1
+        assert list(it) == [[3.0, 4.0]]
+        assert mock_client.embed.call_count == 2
+
+    def test_empty_input_yields_nothing(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
+        assert list(get_embeddings_iter([], config)) == []
+        mock_ollama_client.assert_not_called()
+
+
+class TestPrefetchEmbeddings:
+    """prefetch_embeddings() overlaps the next embed call with the consumer."""
+
+    def test_results_in_batch_order(self, mock_ollama_client: MagicMock, config: Config) -> None:
+        mock_client = mock_ollama_client.return_value
+        mock_client.embed.side_effect = lambda input, **kw: {
+            "embeddings": [[float(ord(t)), 0.0] for t in input]
+        }
+        result = list(prefetch_embeddings([["a"], ["b", "c"], ["d"]], config))
+        assert result == [[[97.0, 0.0]], [[98.0, 0.0], [99.0, 0.0]], [[100.0, 0.0]]]
+
+    def test_prefetch_overlaps(self, mock_ollama_client: MagicMock, config: Config) -> None:
+        """Batch 2 is requested while the consumer still holds batch 1."""
+        started = [threading.Event() for _ in range(3)]
+        calls = iter(range(3))
+
+        def fake_embed(input: list[str], **kwargs: object) -> dict[str, list[list[float]]]:
+            started[next(calls)].set()
+            return {"embeddings": [[1.0, 2.0]] * len(input)}
+
+        mock_ollama_client.return_value.embed.side_effect = fake_embed
+        it = prefetch_embeddings([["a"], ["b"], ["c"]], config, depth=1)
+        next(it)
+        assert started[1].wait(timeout=5)
+        assert len(list(it)) == 2
+
+    def test_custom_embed_results_passed_through(
+        self, mock_ollama_client: MagicMock, config: Config
+    ) -> None:
+        """A caller-supplied embed function replaces get_embeddings()."""
+
+        def embed(batch: list[str], config: Config) -> list[list[float]] | None:
+            return None if "bad" in batch else [[1.0, 2.0]] * len(batch)
+
+        it = prefetch_embeddings([["a"], ["bad"], ["c", "d"]], config, embed=embed)
+        assert list(it) == [[[1.0, 2.0]], None, [[1.0, 2.0], [1.0, 2.0]]]
+        mock_ollama_client.return_value.embed.assert_not_called()
+
+
+class TestDirectEmbedClient:
+    """ollama_direct_embed posts to /api/embed without the ollama SDK."""
+
+    @pytest.fixture()
+    def mock_http(self, monkeypatch: pytest.MonkeyPatch) -> Iterator[MagicMock]:
+        fake = MagicMock()
+        monkeypatch.setattr("ragling.embeddings.httpx.Client", fake)
+        _direct_client.cache_clear()
+        yield fake
+        _direct_client.cache_clear()
+
+    def _response(self, status: int, body: dict[str, object]) -> MagicMock:
+        response = MagicMock()
+        response.is_error = status >= 400
+        response.status_code = status
+        response.json.return_value = body
+        return response
+
+    def test_posts_model_and_input(
+        self, mock_http: MagicMock, mock_ollama_client: MagicMock
+    ) -> None:
+        post = mock_http.return_value.post
+        post.return_value = self._response(200, {"embeddings": [[1.0, 2.0], [3.0, 4.0]]})
+        config = Config(embedding_dimensions=2, ollama_direct_embed=True)
+        assert get_embeddings(["a", "b"], config) == [[1.0, 2.0], [3.0, 4.0]]
+        post.assert_called_once_with("/api/embed", json={"model": "bge-m3", "input": ["a", "b"]})
+        mock_ollama_client.assert_not_called()
+
+    def test_client_reused_across_calls(self, mock_http: MagicMock) -> None:
+        """One httpx.Client per Ollama URL, so keep-alive connections are reused."""
+        mock_http.return_value.post.return_value = self._response(200, {"embeddings": [[1.0, 2.0]]})
+        config = Config(embedding_dimensions=2, ollama_direct_embed=True)
+        get_embedding("a", config)
+        get_embedding("b", config.with_overrides(chunk_size_tokens=512))
+        assert mock_http.call_count == 1
+
+        get_embedding("c", config.with_overrides(ollama_host="http://gpu-box:11434"))
+        assert mock_http.call_count == 2
+
+    def test_error_body_raised_as_response_error(self, mock_http: MagicMock) -> None:
+        """Ollama's error text is preserved so NaN detection still works."""
+        post = mock_http.return_value.post
+        post.side_effect = [
+            self._response(500, {"error": "json: unsupported value: NaN"}),
+            self._response(200, {"embeddings": [[1.0, 2.0]]}),
+            self._response(200, {"embeddings": [[3.0, 4.0]]}),
+        ]
+        config = Config(embedding_dimensions=2, ollama_direct_embed=True)
+        assert get_embeddings(["a", "b"], config) == [[1.0, 2.0], [3.0, 4.0]]
+        assert post.call_count == 3  # batch, then two individual calls
+
+    @pytest.mark.parametrize(
+        ("host", "expected"),
+        [
+            (None, "http://127.0.0.1:11434"),
+            ("http://gpu-box:11434", "http://gpu-box:11434"),
+            ("gpu-box", "http://gpu-box:11434"),
+            ("https://ollama.example.com/", "https://ollama.example.com"),
+        ],
+    )
+    def test_base_url_resolution(
+        self, monkeypatch: pytest.MonkeyPatch, host: str | None, expected: str
+    ) -> None:
+        monkeypatch.delenv("OLLAMA_HOST", raising=False)
+        assert _ollama_base_url(Config(ollama_host=host)) == expected
+
+    def test_base_url_falls_back_to_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("OLLAMA_HOST", "0.0.0.0")
+        assert _ollama_base_url(Config()) == "http://0.0.0.0:11434"
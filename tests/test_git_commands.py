@@ -8,21 +8,20 @@ from pathlib import Path
 
 import pytest
 
+# Commit identity via environment, so test repos need no `git config` calls
+_GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "T",
+    "GIT_AUTHOR_EMAIL": "t@t.com",
+    "GIT_COMMITTER_NAME": "T",
+    "GIT_COMMITTER_EMAIL": "t@t.com",
+}
+
 
 @pytest.fixture()
 def git_repo(tmp_path: Path) -> Path:
     """Create a git repo with one committed file."""
     subprocess.run(["git", "init", str(tmp_path)], capture_output=True, check=True)
-    subprocess.run(
-        ["git", "-C", str(tmp_path), "config", "user.email", "t@t.com"],
-        capture_output=True,
-        check=True,
-    )
-    subprocess.run(
-        ["git", "-C", str(tmp_path), "config", "user.name", "T"],
-        capture_output=True,
-        check=True,
-    )
     (tmp_path / "f.txt").write_text("x")
     subprocess.run(
         ["git", "-C", str(tmp_path), "add", "."],
@@ -33,13 +32,7 @@ def git_repo(tmp_path: Path) -> Path:
         ["git", "-C", str(tmp_path), "commit", "-m", "init"],
         capture_output=True,
         check=True,
-        env={
-            **os.environ,
-            "GIT_AUTHOR_NAME": "T",
-            "GIT_AUTHOR_EMAIL": "t@t.com",
-            "GIT_COMMITTER_NAME": "T",
-            "GIT_COMMITTER_EMAIL": "t@t.com",
-        },
+        env=_GIT_ENV,
     )
     return tmp_path
 
@@ -132,6 +125,19 @@ class TestRunGit:
         with pytest.raises(subprocess.CalledProcessError):
             run_git(git_repo, "not-a-real-command")
 
+    def test_non_utf8_and_crlf_content_is_decoded_leniently(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import run_git
+
+        (git_repo / "latin1.py").write_bytes(b'x = "caf\xe9"\r\n')
+        subprocess.run(
+            ["git", "-C", str(git_repo), "add", "latin1.py"],
+            capture_output=True,
+            check=True,
+        )
+
+        result = run_git(git_repo, "diff", "--cached")
+        assert 'x = "caf\ufffd"\r\n' in result.stdout
+
 
 class TestGetHeadSha:
     """get_head_sha returns HEAD commit SHA."""
@@ -161,19 +167,52 @@ class TestGitLsFiles:
             ["git", "-C", str(git_repo), "commit", "-m", "add a"],
             capture_output=True,
             check=True,
-            env={
-                **os.environ,
-                "GIT_AUTHOR_NAME": "T",
-                "GIT_AUTHOR_EMAIL": "t@t.com",
-                "GIT_COMMITTER_NAME": "T",
-                "GIT_COMMITTER_EMAIL": "t@t.com",
-            },
+            env=_GIT_ENV,
         )
 
         files = git_ls_files(git_repo)
         assert "f.txt" in files
         assert "a.py" in files
 
+    def test_non_ascii_and_space_paths_are_not_quoted(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import git_ls_files
+
+        for name in ("café.py", "a b.py"):
+            (git_repo / name).write_text("pass")
+        subprocess.run(
+            ["git", "-C", str(git_repo), "add", "."],
+            capture_output=True,
+            check=True,
+        )
+
+        files = git_ls_files(git_repo)
+        assert "café.py" in files
+        assert "a b.py" in files
+        assert all((git_repo / f).exists() for f in files)
+
+
+class TestGitDiffNames:
+    """git_diff_names lists paths changed between two commits."""
+
+    def test_returns_changed_paths_verbatim(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import get_head_sha, git_diff_names
+
+        base = get_head_sha(git_repo)
+        (git_repo / "café.py").write_text("pass")
+        subprocess.run(
+            ["git", "-C", str(git_repo), "add", "."],
+            capture_output=True,
+            check=True,
+        )
+        subprocess.run(
+            ["git", "-C", str(git_repo), "commit", "-m", "add cafe"],
+            capture_output=True,
+            check=True,
+            env=_GIT_ENV,
+        )
+
+        assert git_diff_names(git_repo, base) == ["café.py"]
+
 
 class TestCommitExists:
     """commit_exists checks if a SHA exists."""
@@ -225,3 +264,109 @@ class TestFileChange:
         assert fc.additions == 10
         assert fc.deletions == 2
         assert fc.is_binary is False
+
+
+class TestGetCommitFileDiffs:
+    """get_commit_file_diffs batches per-file diffs into one git call."""
+
+    def test_matches_per_file_diffs(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import (
+            get_commit_file_diffs,
+            get_file_diff,
+            get_head_sha,
+        )
+
+        (git_repo / "f.txt").write_text("y\n")
+        (git_repo / "sub").mkdir()
+        (git_repo / "sub" / "g.py").write_text("def g():\n    pass\n")
+        subprocess.run(["git", "-C", str(git_repo), "add", "."], capture_output=True, check=True)
+        subprocess.run(
+            ["git", "-C", str(git_repo), "commit", "-m", "two files"],
+            capture_output=True,
+            check=True,
+            env=_GIT_ENV,
+        )
+        sha = get_head_sha(git_repo)
+
+        diffs = get_commit_file_diffs(git_repo, sha)
+
+        assert set(diffs) == {"f.txt", "sub/g.py"}
+        for path, text in diffs.items():
+            assert text == get_file_diff(git_repo, sha, path)
+
+    def test_unknown_commit_returns_empty(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import get_commit_file_diffs
+
+        assert get_commit_file_diffs(git_repo, "deadbeef" * 5) == {}
+
+
+class TestIterCommitFileData:
+    """iter_commit_file_data matches the per-commit helpers across batches."""
+
+    def _commit(self, repo: Path, message: str) -> None:
+        subprocess.run(["git", "-C", str(repo), "add", "-A"], capture_output=True, check=True)
+        subprocess.run(
+            ["git", "-C", str(repo), "commit", "-m", message],
+            capture_output=True,
+            check=True,
+            env=_GIT_ENV,
+        )
+
+    def test_matches_per_commit_helpers(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import (
+            get_commit_file_changes,
+            get_commit_file_diffs,
+            get_head_sha,
+            iter_commit_file_data,
+        )
+
+        shas = []
+        for i in range(5):
+            (git_repo / f"file{i}.py").write_text(f"x = {i}\n")
+            (git_repo / "f.txt").write_text(f"rev {i}\n")
+            self._commit(git_repo, f"commit {i}")
+            shas.append(get_head_sha(git_repo))
+
+        results = list(iter_commit_file_data(git_repo, shas, batch_size=2))
+
+        assert len(results) == len(shas)
+        for sha, (changes, diffs) in zip(shas, results, strict=True):
+            assert changes == get_commit_file_changes(git_repo, sha)
+            assert diffs == get_commit_file_diffs(git_repo, sha)
+
+    def test_bad_sha_falls_back_per_commit(self, git_repo: Path) -> None:
+        from ragling.indexers.git_commands import (
+            get_commit_file_changes,
+            get_head_sha,
+            iter_commit_file_data,
+        )
+
+        sha = get_head_sha(git_repo)
+
+        results = list(iter_commit_file_data(git_repo, [sha, "deadbeef" * 5]))
+
+        assert results[0][0] == get_commit_file_changes(git_repo, sha)
+        assert results[1] == ([], {})
+
+    def test_unparseable_batch_falls_back_per_commit(
+        self, git_repo: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from ragling.indexers import git_commands
+        from ragling.indexers.git_commands import (
+            get_commit_file_changes,
+            get_commit_file_diffs,
+            get_head_sha,
+            iter_commit_file_data,
+        )
+
+        def broken_batch(repo_path: Path, batch: list[str]) -> None:
+            raise IndexError("unexpected git show output")
+
+        monkeypatch.setattr(git_commands, "_show_commit_batch", broken_batch)
+        sha = get_head_sha(git_repo)
+
+        results = list(iter_commit_file_data(git_repo, [sha]))
+
+        assert results == [
+            (get_commit_file_changes(git_repo, sha), get_commit_file_diffs(git_repo, sha))
+        ]
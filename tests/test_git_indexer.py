@@ -4,17 +4,24 @@ from __future__ import annotations
 
 import json
 import os
+import shutil
 import sqlite3
 import subprocess
+import time
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock
 
 import pytest
 
-from tests.helpers import fake_embeddings, make_test_config, make_test_conn
+from tests.helpers import (
+    fake_embeddings,
+    make_test_config,
+    make_test_conn,
+    make_test_mem_conn,
+)
 from ragling.config import Config
 from ragling.indexers.base import IndexResult
-from ragling.indexers.git_commands import git_ls_files
+from ragling.indexers.git_commands import get_head_sha, git_ls_files
 from ragling.indexers.git_indexer import (
     GitRepoIndexer,
     _code_blocks_to_chunks,
@@ -30,6 +37,15 @@ from ragling.parsers.code import CodeBlock, CodeDocument
 
 EMBED_DIM = 4
 
+# Built once: copying os.environ for every git call adds up across the suite
+_GIT_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "Test",
+    "GIT_AUTHOR_EMAIL": "test@test.com",
+    "GIT_COMMITTER_NAME": "Test",
+    "GIT_COMMITTER_EMAIL": "test@test.com",
+}
+
 
 def _run_git(repo: Path, *args: str) -> None:
     """Run a git command in the given repo with deterministic author info."""
@@ -37,14 +53,67 @@ def _run_git(repo: Path, *args: str) -> None:
         ["git", "-C", str(repo), *args],
         check=True,
         capture_output=True,
-        env={
-            **os.environ,
-            "GIT_AUTHOR_NAME": "Test",
-            "GIT_AUTHOR_EMAIL": "test@test.com",
-            "GIT_COMMITTER_NAME": "Test",
-            "GIT_COMMITTER_EMAIL": "test@test.com",
-        },
+        env=_GIT_ENV,
+    )
+
+
+def _init_repo(repo: Path, files: dict[str, str], msg: str) -> None:
+    """Create a git repo at *repo* holding *files* (plus anything already there) in one commit.
+
+    Identity and signing go on the commit as ``-c`` flags, so the repo
+    needs no ``git config`` calls.
+    """
+    repo.mkdir(parents=True, exist_ok=True)
+    _run_git(repo, "init", "-q")
+    for rel_path, content in files.items():
+        (repo / rel_path).write_text(content)
+    _run_git(repo, "add", "-A")
+    _run_git(
+        repo,
+        "-c",
+        "user.email=test@test.com",
+        "-c",
+        "user.name=Test",
+        "-c",
+        "commit.gpgsign=false",
+        "commit",
+        "-q",
+        "-m",
+        msg,
+    )
+
+
+def _fast_import_repo(repo: Path, commits: list[tuple[str, dict[str, str]]]) -> None:
+    """Create a repo at *repo* whose history is *commits*, using one ``git fast-import``.
+
+    Each entry is ``(message, files)``; *files* are added or overwritten on
+    top of the previous commit's tree. Commits are dated now, one second
+    apart, so they fall inside the history window. The working tree is
+    checked out at the last commit.
+    """
+    repo.mkdir(parents=True, exist_ok=True)
+    _run_git(repo, "init", "-q", "-b", "main")
+
+    stream = bytearray()
+    start = int(time.time()) - len(commits)
+    for i, (message, files) in enumerate(commits):
+        msg = message.encode()
+        stamp = f"Test <test@test.com> {start + i} +0000"
+        stream += f"commit refs/heads/main\ncommitter {stamp}\n".encode()
+        stream += b"data %d\n%s\n" % (len(msg), msg)
+        for rel_path, content in files.items():
+            data = content.encode()
+            stream += b"M 100644 inline %s\ndata %d\n%s\n" % (rel_path.encode(), len(data), data)
+        stream += b"\n"
+
+    subprocess.run(
+        ["git", "-C", str(repo), "fast-import", "--quiet"],
+        input=bytes(stream),
+        check=True,
+        capture_output=True,
+        env=_GIT_ENV,
     )
+    _run_git(repo, "reset", "-q", "--hard")
 
 
 def _make_conn(tmp_path: Path) -> sqlite3.Connection:
@@ -62,61 +131,129 @@ def _make_config(tmp_path: Path) -> Config:
     )
 
 
+_GIT_OBJECTS_DIR = f"{os.sep}.git{os.sep}objects{os.sep}"
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard-link git object files, copy everything else.
+
+    Objects are content-addressed and never rewritten in place, so a
+    template and its copies can share them. Working-tree files, the index
+    and refs are mutated by tests and get real copies.
+    """
+    if _GIT_OBJECTS_DIR in src:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+
+def _copy_repo(template: Path, tmp_path: Path) -> Path:
+    """Copy a prebuilt template repo into the test's own tmp_path."""
+    repo = tmp_path / "repo"
+    shutil.copytree(template, repo, symlinks=True, copy_function=_link_or_copy)
+    return repo
+
+
+# Repo fixtures build each repo once per session and hand every test a
+# private copy, so tests may mutate (add commits, delete files) freely.
+
+
+@pytest.fixture(scope="session")
+def _simple_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    repo = tmp_path_factory.mktemp("simple_repo_template") / "repo"
+    _init_repo(repo, {"hello.py": "def hello():\n    print('hello')\n"}, "initial commit")
+    return repo
+
+
 @pytest.fixture
-def simple_repo(tmp_path: Path) -> Path:
+def simple_repo(tmp_path: Path, _simple_repo_template: Path) -> Path:
     """A git repo with one Python file and one commit."""
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _run_git(repo, "init")
-    _run_git(repo, "config", "user.email", "test@test.com")
-    _run_git(repo, "config", "user.name", "Test")
-    (repo / "hello.py").write_text("def hello():\n    print('hello')\n")
-    _run_git(repo, "add", ".")
-    _run_git(repo, "commit", "-m", "initial commit")
+    return _copy_repo(_simple_repo_template, tmp_path)
+
+
+@pytest.fixture(scope="session")
+def _multi_file_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    repo = tmp_path_factory.mktemp("multi_file_repo_template") / "repo"
+    _init_repo(
+        repo,
+        {
+            "main.py": "def main():\n    pass\n",
+            "utils.py": "def helper():\n    return 42\n",
+            "README.md": "# My Project\n",
+            "data.txt": "some data\n",
+        },
+        "initial",
+    )
     return repo
 
 
 @pytest.fixture
-def multi_file_repo(tmp_path: Path) -> Path:
+def multi_file_repo(tmp_path: Path, _multi_file_repo_template: Path) -> Path:
     """A git repo with multiple Python files and a non-code file."""
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _run_git(repo, "init")
-    _run_git(repo, "config", "user.email", "test@test.com")
-    _run_git(repo, "config", "user.name", "Test")
-    (repo / "main.py").write_text("def main():\n    pass\n")
-    (repo / "utils.py").write_text("def helper():\n    return 42\n")
-    (repo / "README.md").write_text("# My Project\n")
-    (repo / "data.txt").write_text("some data\n")
-    _run_git(repo, "add", ".")
-    _run_git(repo, "commit", "-m", "initial")
+    return _copy_repo(_multi_file_repo_template, tmp_path)
+
+
+@pytest.fixture(scope="session")
+def _multi_commit_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    repo = tmp_path_factory.mktemp("multi_commit_repo_template") / "repo"
+    _fast_import_repo(
+        repo,
+        [
+            ("first commit", {"app.py": "def app():\n    pass\n"}),
+            ("update app", {"app.py": "def app():\n    return 'v2'\n"}),
+            ("add lib", {"lib.py": "def lib_func():\n    return True\n"}),
+        ],
+    )
     return repo
 
 
 @pytest.fixture
-def multi_commit_repo(tmp_path: Path) -> Path:
+def multi_commit_repo(tmp_path: Path, _multi_commit_repo_template: Path) -> Path:
     """A git repo with multiple commits for history testing."""
-    repo = tmp_path / "repo"
-    repo.mkdir()
-    _run_git(repo, "init")
-    _run_git(repo, "config", "user.email", "test@test.com")
-    _run_git(repo, "config", "user.name", "Test")
+    return _copy_repo(_multi_commit_repo_template, tmp_path)
 
-    (repo / "app.py").write_text("def app():\n    pass\n")
-    _run_git(repo, "add", ".")
-    _run_git(repo, "commit", "-m", "first commit")
 
-    (repo / "app.py").write_text("def app():\n    return 'v2'\n")
-    _run_git(repo, "add", ".")
-    _run_git(repo, "commit", "-m", "update app")
+@pytest.fixture(scope="session")
+def _readme_only_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    repo = tmp_path_factory.mktemp("readme_only_repo_template") / "repo"
+    _init_repo(repo, {"README.md": "# Empty\n"}, "initial")
+    return repo
 
-    (repo / "lib.py").write_text("def lib_func():\n    return True\n")
-    _run_git(repo, "add", ".")
-    _run_git(repo, "commit", "-m", "add lib")
 
+@pytest.fixture(scope="session")
+def _lockfile_repo_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    repo = tmp_path_factory.mktemp("lockfile_repo_template") / "repo"
+    _init_repo(
+        repo,
+        {
+            "main.py": "def main():\n    pass\n",
+            # This file would be code but matches the exclude pattern
+            "package-lock.json": "{}\n",
+        },
+        "initial",
+    )
     return repo
 
 
+@pytest.fixture(autouse=True)
+def _stub_embeddings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replace get_embeddings with fake_embeddings for every test in this module."""
+    monkeypatch.setattr("ragling.indexers.base.get_embeddings", fake_embeddings)
+    monkeypatch.setattr("ragling.indexers.git_indexer.get_embeddings", fake_embeddings)
+
+
+@pytest.fixture
+def mock_embed(monkeypatch: pytest.MonkeyPatch, _stub_embeddings: None) -> MagicMock:
+    """Wrap fake_embeddings in a MagicMock, for tests that inspect embedding calls."""
+    mock = MagicMock(side_effect=fake_embeddings)
+    monkeypatch.setattr("ragling.indexers.base.get_embeddings", mock)
+    monkeypatch.setattr("ragling.indexers.git_indexer.get_embeddings", mock)
+    return mock
+
+
 # ---------------------------------------------------------------------------
 # Tests: git_ls_files
 # ---------------------------------------------------------------------------
@@ -171,6 +308,21 @@ class TestShouldExclude:
         assert _should_exclude("src/__pycache__/module.pyc") is True
         assert _should_exclude("frontend/node_modules/pkg/index.js") is True
 
+    def test_matches_whole_segments_only(self) -> None:
+        assert _should_exclude("mynode_modules/foo.js") is False
+        assert _should_exclude("build.py") is False
+        assert _should_exclude("src/build") is False  # dir pattern needs a trailing segment
+        assert _should_exclude("docs/uv.lock.md") is False
+        assert _should_exclude("rust/Cargo.lock") is True
+
+    def test_repeated_lookups_hit_cache(self) -> None:
+        _should_exclude.cache_clear()
+        for _ in range(3):
+            assert _should_exclude("src/app/models.py") is False
+        info = _should_exclude.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
 
 # ---------------------------------------------------------------------------
 # Tests: _parse_watermarks and _make_watermarks
@@ -237,10 +389,7 @@ class TestWatermarks:
 
 
 class TestCodeFileIndexing:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_indexes_python_files(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_indexes_python_files(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -251,9 +400,8 @@ class TestCodeFileIndexing:
         assert result.indexed >= 1
         assert result.errors == 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_creates_documents_in_db(  # Tests Indexers INV-2
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
+        self, simple_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -264,9 +412,8 @@ class TestCodeFileIndexing:
         doc_count = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
         assert doc_count > 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_creates_vector_embeddings(  # Tests Indexers INV-2
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
+        self, simple_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -277,10 +424,7 @@ class TestCodeFileIndexing:
         vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
         assert vec_count > 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_source_type_is_code(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_source_type_is_code(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -290,10 +434,7 @@ class TestCodeFileIndexing:
         row = conn.execute("SELECT source_type FROM sources LIMIT 1").fetchone()
         assert row["source_type"] == "code"
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_only_indexes_code_files(
-        self, mock_embed: object, multi_file_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_only_indexes_code_files(self, multi_file_repo: Path, tmp_path: Path) -> None:
         """Non-code files (README.md, data.txt) should not produce sources."""
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -310,10 +451,7 @@ class TestCodeFileIndexing:
         assert not any("README.md" in p for p in source_paths)
         assert not any("data.txt" in p for p in source_paths)
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_document_content_contains_code(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_document_content_contains_code(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -325,10 +463,7 @@ class TestCodeFileIndexing:
         # The content should contain the Python code from hello.py
         assert "hello" in content
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_collection_type_is_code(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_collection_type_is_code(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -341,15 +476,33 @@ class TestCodeFileIndexing:
         assert row["collection_type"] == "code"
 
 
+class TestEmbeddingBatching:
+    """Small files are embedded together rather than one call per file."""
+
+    def test_small_files_share_one_embedding_call(
+        self, mock_embed: MagicMock, multi_file_repo: Path, tmp_path: Path
+    ) -> None:
+        conn = _make_conn(tmp_path)
+        config = _make_config(tmp_path)
+        indexer = GitRepoIndexer(multi_file_repo, "test-group")
+
+        result = indexer.index(conn, config)
+
+        assert result.indexed == 2
+        assert mock_embed.call_count == 1
+        doc_count = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        assert doc_count == vec_count == len(mock_embed.call_args.args[0])
+
+
 # ---------------------------------------------------------------------------
 # Tests: Watermark persistence via index()
 # ---------------------------------------------------------------------------
 
 
 class TestWatermarkPersistence:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_stores_watermark_after_indexing(  # Tests Indexers INV-4
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
+        self, simple_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -366,10 +519,7 @@ class TestWatermarkPersistence:
         # The watermark should be a 40-char hex SHA
         assert len(watermarks[repo_key]) == 40
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_watermark_matches_head(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_watermark_matches_head(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -399,9 +549,8 @@ class TestWatermarkPersistence:
 
 
 class TestIncrementalIndexing:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_second_run_no_changes_skips(  # Tests Indexers INV-3
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
+        self, simple_repo: Path, tmp_path: Path
     ) -> None:
         """If HEAD hasn't changed, second index() should skip everything."""
         conn = _make_conn(tmp_path)
@@ -415,10 +564,7 @@ class TestIncrementalIndexing:
         assert result2.indexed == 0
         assert result2.total_found == 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_new_commit_indexes_changed_files(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_new_commit_indexes_changed_files(self, simple_repo: Path, tmp_path: Path) -> None:
         """After a new commit, only changed files should be re-indexed."""
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -429,16 +575,12 @@ class TestIncrementalIndexing:
 
         # Make a new commit that modifies the file
         (simple_repo / "hello.py").write_text("def hello():\n    print('world')\n")
-        _run_git(simple_repo, "add", ".")
-        _run_git(simple_repo, "commit", "-m", "update hello")
+        _run_git(simple_repo, "commit", "-qam", "update hello")
 
         result2 = indexer.index(conn, config)
         assert result2.indexed >= 1
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_new_file_added_gets_indexed(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_new_file_added_gets_indexed(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -459,10 +601,7 @@ class TestIncrementalIndexing:
         assert any("new_module.py" in p for p in source_paths)
         assert any("hello.py" in p for p in source_paths)
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_force_reindexes_all(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_force_reindexes_all(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
@@ -480,10 +619,7 @@ class TestIncrementalIndexing:
 
 
 class TestPruneBehavior:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_deleted_file_is_pruned(
-        self, mock_embed: object, multi_file_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_deleted_file_is_pruned(self, multi_file_repo: Path, tmp_path: Path) -> None:
         """When a tracked file is deleted and committed, re-indexing removes it."""
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -497,17 +633,23 @@ class TestPruneBehavior:
 
         # Delete utils.py and commit
         (multi_file_repo / "utils.py").unlink()
-        _run_git(multi_file_repo, "add", ".")
-        _run_git(multi_file_repo, "commit", "-m", "remove utils")
+        _run_git(multi_file_repo, "commit", "-qam", "remove utils")
 
         indexer.index(conn, config)
 
-        # utils.py should be gone from sources
-        sources = conn.execute("SELECT source_path FROM sources").fetchall()
-        source_paths = [r["source_path"] for r in sources]
-        assert not any("utils.py" in p for p in source_paths)
+        def has_source(suffix: str) -> bool:
+            row = conn.execute(
+                "SELECT 1 FROM sources WHERE source_path LIKE ? LIMIT 1", (f"%{suffix}",)
+            ).fetchone()
+            return row is not None
+
+        # utils.py should be gone from sources, along with its vectors
+        assert not has_source("/utils.py")
         # main.py should still be there
-        assert any("main.py" in p for p in source_paths)
+        assert has_source("/main.py")
+        doc_count = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        assert vec_count == doc_count
 
 
 # ---------------------------------------------------------------------------
@@ -516,9 +658,8 @@ class TestPruneBehavior:
 
 
 class TestCommitHistoryIndexing:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_index_history_produces_commit_sources(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
+        self, multi_commit_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -535,9 +676,8 @@ class TestCommitHistoryIndexing:
         ).fetchall()
         assert len(commit_sources) > 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_commit_source_paths_have_git_uri_format(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
+        self, multi_commit_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -552,10 +692,7 @@ class TestCommitHistoryIndexing:
             assert row["source_path"].startswith("git://")
             assert "#" in row["source_path"]
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_commit_documents_contain_diff(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_commit_documents_contain_diff(self, multi_commit_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(multi_commit_repo, "test-group")
@@ -577,10 +714,42 @@ class TestCommitHistoryIndexing:
         # Commit chunks contain the commit message at minimum
         assert "commit" in all_content.lower() or "def" in all_content.lower()
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_history_watermark_stored(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
+    def test_commit_data_error_only_fails_that_commit(
+        self, multi_commit_repo: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        """An error reading one commit's diffs doesn't abort the rest of the history."""
+        from ragling.indexers import git_indexer
+
+        real_iter = git_indexer.iter_commit_file_data
+        failed_sha: list[str] = []
+
+        def iter_failing_once(repo_path: Path, shas: list[str], **kwargs):  # type: ignore[no-untyped-def]
+            for sha, data in zip(shas, real_iter(repo_path, shas, **kwargs), strict=True):
+                if not failed_sha:
+                    failed_sha.append(sha)
+                    raise RuntimeError("unparseable git show output")
+                yield data
+
+        def commit_shas(conn: sqlite3.Connection) -> set[str]:
+            rows = conn.execute("SELECT source_path FROM sources WHERE source_type = 'commit'")
+            return {r["source_path"].rsplit("#", 1)[1] for r in rows}
+
+        config = _make_config(tmp_path)
+        baseline_conn = make_test_mem_conn()
+        GitRepoIndexer(multi_commit_repo, "test-group").index(
+            baseline_conn, config, index_history=True
+        )
+
+        monkeypatch.setattr(git_indexer, "iter_commit_file_data", iter_failing_once)
+        conn = _make_conn(tmp_path)
+        result = GitRepoIndexer(multi_commit_repo, "test-group").index(
+            conn, config, index_history=True
+        )
+
+        assert result.errors == 1
+        assert commit_shas(conn) == commit_shas(baseline_conn) - set(failed_sha)
+
+    def test_history_watermark_stored(self, multi_commit_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(multi_commit_repo, "test-group")
@@ -594,10 +763,11 @@ class TestCommitHistoryIndexing:
         repo_key = str(multi_commit_repo.resolve())
         history_key = f"{repo_key}:history"
         assert history_key in watermarks
+        # The history write must keep the code watermark set earlier in the pass
+        assert watermarks[repo_key] == get_head_sha(multi_commit_repo)
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_incremental_history_skips_already_indexed(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
+        self, multi_commit_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -621,26 +791,16 @@ class TestCommitHistoryIndexing:
 
 
 class TestSubjectBlacklist:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_blacklisted_commits_excluded(self, mock_embed: object, tmp_path: Path) -> None:
+    def test_blacklisted_commits_excluded(self, tmp_path: Path) -> None:
         """Commits whose subject starts with a blacklisted prefix are excluded."""
         repo = tmp_path / "repo"
-        repo.mkdir()
-        _run_git(repo, "init")
-        _run_git(repo, "config", "user.email", "test@test.com")
-        _run_git(repo, "config", "user.name", "Test")
-
-        (repo / "app.py").write_text("def app():\n    pass\n")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "initial commit")
+        _init_repo(repo, {"app.py": "def app():\n    pass\n"}, "initial commit")
 
         (repo / "app.py").write_text("def app():\n    return 1\n")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "Merge pull request #1")
+        _run_git(repo, "commit", "-qam", "Merge pull request #1")
 
         (repo / "app.py").write_text("def app():\n    return 2\n")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "real feature")
+        _run_git(repo, "commit", "-qam", "real feature")
 
         config = _make_config(tmp_path).with_overrides(
             git_commit_subject_blacklist=("Merge pull request",),
@@ -698,28 +858,13 @@ class TestNotAGitRepo:
 
 
 class TestMultiRepoWatermarks:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_two_repos_in_same_collection(
-        self, mock_embed: object, tmp_path: Path
-    ) -> None:  # Tests Indexers INV-4
+    def test_two_repos_in_same_collection(self, tmp_path: Path) -> None:  # Tests Indexers INV-4
         """Two repos indexed into the same collection should both have watermarks."""
         repo1 = tmp_path / "repo1"
-        repo1.mkdir()
-        _run_git(repo1, "init")
-        _run_git(repo1, "config", "user.email", "test@test.com")
-        _run_git(repo1, "config", "user.name", "Test")
-        (repo1 / "a.py").write_text("def a():\n    pass\n")
-        _run_git(repo1, "add", ".")
-        _run_git(repo1, "commit", "-m", "repo1 init")
+        _init_repo(repo1, {"a.py": "def a():\n    pass\n"}, "repo1 init")
 
         repo2 = tmp_path / "repo2"
-        repo2.mkdir()
-        _run_git(repo2, "init")
-        _run_git(repo2, "config", "user.email", "test@test.com")
-        _run_git(repo2, "config", "user.name", "Test")
-        (repo2 / "b.py").write_text("def b():\n    pass\n")
-        _run_git(repo2, "add", ".")
-        _run_git(repo2, "commit", "-m", "repo2 init")
+        _init_repo(repo2, {"b.py": "def b():\n    pass\n"}, "repo2 init")
 
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -738,28 +883,13 @@ class TestMultiRepoWatermarks:
         assert str(repo1.resolve()) in watermarks
         assert str(repo2.resolve()) in watermarks
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_second_repo_does_not_clobber_first_watermark(
-        self, mock_embed: object, tmp_path: Path
-    ) -> None:
+    def test_second_repo_does_not_clobber_first_watermark(self, tmp_path: Path) -> None:
         """Indexing repo2 should preserve repo1's watermark."""
         repo1 = tmp_path / "repo1"
-        repo1.mkdir()
-        _run_git(repo1, "init")
-        _run_git(repo1, "config", "user.email", "test@test.com")
-        _run_git(repo1, "config", "user.name", "Test")
-        (repo1 / "a.py").write_text("def a():\n    pass\n")
-        _run_git(repo1, "add", ".")
-        _run_git(repo1, "commit", "-m", "repo1 init")
+        _init_repo(repo1, {"a.py": "def a():\n    pass\n"}, "repo1 init")
 
         repo2 = tmp_path / "repo2"
-        repo2.mkdir()
-        _run_git(repo2, "init")
-        _run_git(repo2, "config", "user.email", "test@test.com")
-        _run_git(repo2, "config", "user.name", "Test")
-        (repo2 / "b.py").write_text("def b():\n    pass\n")
-        _run_git(repo2, "add", ".")
-        _run_git(repo2, "commit", "-m", "repo2 init")
+        _init_repo(repo2, {"b.py": "def b():\n    pass\n"}, "repo2 init")
 
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -792,40 +922,35 @@ class TestMultiRepoWatermarks:
 
 
 class TestDocumentMetadata:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_code_document_has_language_metadata(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_code_document_has_language_metadata(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
 
         indexer.index(conn, config)
 
-        row = conn.execute("SELECT metadata FROM documents LIMIT 1").fetchone()
-        metadata = json.loads(row["metadata"])
-        assert "language" in metadata
-        assert metadata["language"] == "python"
+        row = conn.execute(
+            "SELECT json_extract(metadata, '$.language') AS language FROM documents LIMIT 1"
+        ).fetchone()
+        assert row["language"] == "python"
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_code_document_has_symbol_metadata(
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
-    ) -> None:
+    def test_code_document_has_symbol_metadata(self, simple_repo: Path, tmp_path: Path) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
 
         indexer.index(conn, config)
 
-        docs = conn.execute("SELECT metadata FROM documents").fetchall()
-        all_metadata = [json.loads(r["metadata"]) for r in docs]
         # At least one document should have symbol_name and symbol_type
-        assert any("symbol_name" in m for m in all_metadata)
-        assert any("symbol_type" in m for m in all_metadata)
+        row = conn.execute(
+            "SELECT count(json_type(metadata, '$.symbol_name')) AS names, "
+            "count(json_type(metadata, '$.symbol_type')) AS types FROM documents"
+        ).fetchone()
+        assert row["names"] > 0
+        assert row["types"] > 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_commit_document_has_commit_metadata(
-        self, mock_embed: object, multi_commit_repo: Path, tmp_path: Path
+        self, multi_commit_repo: Path, tmp_path: Path
     ) -> None:
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -833,22 +958,23 @@ class TestDocumentMetadata:
 
         indexer.index(conn, config, index_history=True)
 
-        commit_docs = conn.execute(
+        # json_type() is NULL only for a missing key, so this counts commit
+        # documents lacking any required metadata field
+        row = conn.execute(
             """
-            SELECT d.metadata FROM documents d
+            SELECT count(*) AS total,
+                   sum(json_type(d.metadata, '$.commit_sha') IS NULL
+                       OR json_type(d.metadata, '$.author_name') IS NULL
+                       OR json_type(d.metadata, '$.author_email') IS NULL
+                       OR json_type(d.metadata, '$.commit_message') IS NULL
+                       OR json_type(d.metadata, '$.file_path') IS NULL) AS missing
+            FROM documents d
             JOIN sources s ON d.source_id = s.id
             WHERE s.source_type = 'commit'
-            LIMIT 1
             """
         ).fetchone()
-
-        if commit_docs:
-            metadata = json.loads(commit_docs["metadata"])
-            assert "commit_sha" in metadata
-            assert "author_name" in metadata
-            assert "author_email" in metadata
-            assert "commit_message" in metadata
-            assert "file_path" in metadata
+        assert row["total"] > 0
+        assert row["missing"] == 0
 
 
 # ---------------------------------------------------------------------------
@@ -857,12 +983,11 @@ class TestDocumentMetadata:
 
 
 class TestFileHashChangeDetection:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_unchanged_file_hash_causes_skip(  # Tests Indexers INV-3
-        self, mock_embed: object, simple_repo: Path, tmp_path: Path
+        self, mock_embed: MagicMock, simple_repo: Path, tmp_path: Path
     ) -> None:
         """Files with the same content hash are skipped on incremental index."""
-        conn = _make_conn(tmp_path)
+        conn = make_test_mem_conn()
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(simple_repo, "test-group")
 
@@ -893,19 +1018,11 @@ class TestFileHashChangeDetection:
 
 
 class TestEdgeCases:
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_empty_repo_no_files(self, mock_embed: object, tmp_path: Path) -> None:
+    def test_empty_repo_no_files(self, tmp_path: Path, _readme_only_repo_template: Path) -> None:
         """A repo with no code files should return without error."""
-        repo = tmp_path / "empty-repo"
-        repo.mkdir()
-        _run_git(repo, "init")
-        _run_git(repo, "config", "user.email", "test@test.com")
-        _run_git(repo, "config", "user.name", "Test")
-        (repo / "README.md").write_text("# Empty\n")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "initial")
+        repo = _copy_repo(_readme_only_repo_template, tmp_path)
 
-        conn = _make_conn(tmp_path)
+        conn = make_test_mem_conn()
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(repo, "test-group")
 
@@ -913,22 +1030,31 @@ class TestEdgeCases:
         assert result.errors == 0
         assert result.indexed == 0
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_excluded_files_not_indexed(self, mock_embed: object, tmp_path: Path) -> None:
-        """Files matching exclude patterns should not be indexed."""
+    def test_tracked_symlink_keeps_its_own_source(self, tmp_path: Path) -> None:
+        """A tracked symlink is stored under its own path, not its target's."""
         repo = tmp_path / "repo"
-        repo.mkdir()
-        _run_git(repo, "init")
-        _run_git(repo, "config", "user.email", "test@test.com")
-        _run_git(repo, "config", "user.name", "Test")
+        _init_repo(repo, {"main.py": "def main():\n    pass\n"}, "initial")
+        (repo / "alias.py").symlink_to("main.py")
+        _run_git(repo, "add", "alias.py")
+        _run_git(repo, "commit", "-qm", "add alias")
 
-        (repo / "main.py").write_text("def main():\n    pass\n")
-        # This file would be code but matches the exclude pattern
-        (repo / "package-lock.json").write_text("{}\n")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "initial")
+        conn = make_test_mem_conn()
+        config = _make_config(tmp_path)
+        indexer = GitRepoIndexer(repo, "test-group")
 
-        conn = _make_conn(tmp_path)
+        result = indexer.index(conn, config)
+
+        assert result.indexed == 2
+        paths = {r["source_path"] for r in conn.execute("SELECT source_path FROM sources")}
+        assert paths == {str(repo.resolve() / "main.py"), str(repo.resolve() / "alias.py")}
+
+    def test_excluded_files_not_indexed(
+        self, tmp_path: Path, _lockfile_repo_template: Path
+    ) -> None:
+        """Files matching exclude patterns should not be indexed."""
+        repo = _copy_repo(_lockfile_repo_template, tmp_path)
+
+        conn = make_test_mem_conn()
         config = _make_config(tmp_path)
         indexer = GitRepoIndexer(repo, "test-group")
 
@@ -1100,16 +1226,11 @@ class TestSpecMdIndexing:
         (auth / "handlers.py").write_text(
             "def login(user, password):\n    return authenticate(user, password)\n"
         )
-        _run_git(repo, "init")
-        _run_git(repo, "config", "user.email", "test@test.com")
-        _run_git(repo, "config", "user.name", "Test")
-        _run_git(repo, "add", ".")
-        _run_git(repo, "commit", "-m", "initial with spec")
+        _init_repo(repo, {}, "initial with spec")
         return repo
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_code_file_has_spec_path_in_metadata(
-        self, mock_embed: object, repo_with_spec: Path, tmp_path: Path
+        self, repo_with_spec: Path, tmp_path: Path
     ) -> None:
         """Code files under a SPEC.md directory get spec_path in chunk metadata."""
         conn = _make_conn(tmp_path)
@@ -1127,9 +1248,8 @@ class TestSpecMdIndexing:
             meta = json.loads(row["metadata"])
             assert meta.get("spec_path") == "features/auth/SPEC.md"
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
     def test_spec_md_indexed_as_spec_source_type(  # Tests Indexers INV-10
-        self, mock_embed: object, repo_with_spec: Path, tmp_path: Path
+        self, repo_with_spec: Path, tmp_path: Path
     ) -> None:
         """SPEC.md files should be indexed with source_type='spec'."""
         conn = _make_conn(tmp_path)
@@ -1143,10 +1263,7 @@ class TestSpecMdIndexing:
         assert len(rows) == 1
         assert "SPEC.md" in rows[0]["source_path"]
 
-    @patch("ragling.indexers.git_indexer.get_embeddings", side_effect=fake_embeddings)
-    def test_spec_chunks_have_section_metadata(
-        self, mock_embed: object, repo_with_spec: Path, tmp_path: Path
-    ) -> None:
+    def test_spec_chunks_have_section_metadata(self, repo_with_spec: Path, tmp_path: Path) -> None:
         """SPEC.md chunks should have section-level metadata."""
         conn = _make_conn(tmp_path)
         config = _make_config(tmp_path)
@@ -61,6 +61,14 @@ class TestIndexingQueue:
         st = status or IndexingStatus()
         return IndexingQueue(cfg, st)
 
+    @staticmethod
+    def _drain(q: IndexingQueue) -> None:
+        """Handle every queued item on the calling thread, as the worker would."""
+        while not q._queue.empty():
+            item = q._queue.get_nowait()
+            assert item is not None
+            q._handle(item)
+
     def test_submit_increments_status(self) -> None:
         status = IndexingStatus()
         q = self._make_queue(status=status)
@@ -79,6 +87,92 @@ class TestIndexingQueue:
             "collections": {"docs": 1},
         }
 
+    def test_duplicate_pending_job_is_coalesced(self) -> None:
+        status = IndexingStatus()
+        q = self._make_queue(status=status)
+        job = IndexJob(
+            job_type="file",
+            path=Path("/test.md"),
+            collection_name="docs",
+            indexer_type=IndexerType.PROJECT,
+        )
+        q.submit(job)
+        q.submit(
+            IndexJob(
+                job_type="file",
+                path=Path("/test.md"),
+                collection_name="docs",
+                indexer_type=IndexerType.PROJECT,
+            )
+        )
+        q.submit_many([job, job])
+
+        status_dict = status.to_dict()
+        assert status_dict is not None
+        assert status_dict["total_remaining"] == 1
+        assert q._queue.qsize() == 1
+
+    def test_job_after_prune_is_not_coalesced_with_earlier_one(self) -> None:
+        """Edit, delete, recreate: the directory job re-runs after the prune."""
+        q = self._make_queue()
+        reindex = IndexJob(
+            job_type="file",
+            path=Path("/v/docs"),
+            collection_name="docs",
+            indexer_type=IndexerType.PROJECT,
+        )
+        prune = IndexJob(
+            job_type="file_deleted",
+            path=Path("/v/docs/a.md"),
+            collection_name="docs",
+            indexer_type=IndexerType.PRUNE,
+        )
+        processed: list[IndexJob] = []
+
+        q.submit(reindex)
+        q.submit(prune)
+        q.submit(reindex)
+        with patch.object(q, "_process", side_effect=processed.append):
+            self._drain(q)
+
+        assert processed == [reindex, prune, reindex]
+
+    def test_job_resubmitted_after_pickup_is_queued(self) -> None:
+        """Once the worker takes a job, an identical submit queues a fresh run."""
+        q = self._make_queue()
+        job = IndexJob(
+            job_type="file",
+            path=Path("/test.md"),
+            collection_name="docs",
+            indexer_type=IndexerType.PROJECT,
+        )
+        processed: list[IndexJob] = []
+
+        with patch.object(q, "_process", side_effect=processed.append):
+            q.submit(job)
+            self._drain(q)
+            q.submit(job)
+            self._drain(q)
+
+        assert processed == [job, job]
+
+    def test_submit_many_increments_status_per_collection(self) -> None:
+        status = IndexingStatus()
+        q = self._make_queue(status=status)
+        q.submit_many(
+            IndexJob(
+                job_type="file",
+                path=Path(f"/{name}.md"),
+                collection_name=collection,
+                indexer_type=IndexerType.PROJECT,
+            )
+            for name, collection in [("a", "docs"), ("b", "notes"), ("c", "docs")]
+        )
+        status_dict = status.to_dict()
+        assert status_dict is not None
+        assert status_dict["collections"] == {"docs": 2, "notes": 1}
+        assert q._queue.qsize() == 3
+
     def test_worker_processes_jobs(self) -> None:
         """Worker thread picks up and processes submitted jobs."""
         status = IndexingStatus()
@@ -105,7 +199,6 @@ class TestIndexingQueue:
         q = self._make_queue(status=status)
 
         with patch.object(q, "_process"):
-            q.start()
             q.submit(
                 IndexJob(
                     job_type="file",
@@ -114,7 +207,7 @@ class TestIndexingQueue:
                     indexer_type=IndexerType.PROJECT,
                 )
             )
-            q.shutdown()
+            self._drain(q)
 
         assert status.is_active() is False
 
@@ -131,7 +224,6 @@ class TestIndexingQueue:
                 raise RuntimeError("boom")
 
         with patch.object(q, "_process", side_effect=failing_then_ok):
-            q.start()
             q.submit(
                 IndexJob(
                     job_type="file",
@@ -148,7 +240,7 @@ class TestIndexingQueue:
                     indexer_type=IndexerType.PROJECT,
                 )
             )
-            q.shutdown()
+            self._drain(q)
 
         assert call_count == 2
         assert status.is_active() is False
@@ -169,17 +261,16 @@ class TestIndexingQueue:
             order.append(str(job.path))
 
         with patch.object(q, "_process", side_effect=track_order):
-            q.start()
-            for i in range(5):
-                q.submit(
-                    IndexJob(
-                        job_type="file",
-                        path=Path(f"/file{i}.md"),
-                        collection_name="docs",
-                        indexer_type=IndexerType.PROJECT,
-                    )
+            q.submit_many(
+                IndexJob(
+                    job_type="file",
+                    path=Path(f"/file{i}.md"),
+                    collection_name="docs",
+                    indexer_type=IndexerType.PROJECT,
                 )
-            q.shutdown()
+                for i in range(5)
+            )
+            self._drain(q)
 
         assert order == [f"/file{i}.md" for i in range(5)]
 
@@ -187,53 +278,84 @@ class TestIndexingQueue:
 class TestProcessRouter:
     """Test that _process routes to the correct indexer."""
 
-    def _make_queue_and_process(self, job: IndexJob) -> None:
+    def _make_queue_and_process(self, job: IndexJob, tmp_path: Path) -> None:
         """Create a queue and call _process directly (no threading)."""
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         status = IndexingStatus()
         q = IndexingQueue(config, status)
         q._process(job)
 
+    @pytest.mark.parametrize(
+        ("indexer_type", "job_type", "path", "target"),
+        [
+            (
+                IndexerType.PROJECT,
+                "directory",
+                Path("/docs"),
+                "ragling.indexers.project.ProjectIndexer",
+            ),
+            (
+                IndexerType.CODE,
+                "directory",
+                Path("/repo"),
+                "ragling.indexers.git_indexer.GitRepoIndexer",
+            ),
+            (
+                IndexerType.OBSIDIAN,
+                "directory",
+                Path("/vault"),
+                "ragling.indexers.obsidian.ObsidianIndexer",
+            ),
+            (
+                IndexerType.EMAIL,
+                "system_collection",
+                Path("/emclient"),
+                "ragling.indexers.email_indexer.EmailIndexer",
+            ),
+            (
+                IndexerType.CALIBRE,
+                "system_collection",
+                None,
+                "ragling.indexers.calibre_indexer.CalibreIndexer",
+            ),
+            (
+                IndexerType.RSS,
+                "system_collection",
+                Path("/nnw"),
+                "ragling.indexers.rss_indexer.RSSIndexer",
+            ),
+        ],
+    )
     @patch("ragling.doc_store.DocStore")
     @patch("ragling.indexing_queue.init_db")
     @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.project.ProjectIndexer")
-    def test_routes_project(
-        self, mock_proj: MagicMock, mock_conn: MagicMock, mock_init: MagicMock, mock_ds: MagicMock
+    def test_routes_to_indexer(
+        self,
+        mock_conn: MagicMock,
+        mock_init: MagicMock,
+        mock_ds: MagicMock,
+        indexer_type: IndexerType,
+        job_type: str,
+        path: Path | None,
+        target: str,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_ds.return_value = MagicMock()
-        mock_proj.return_value.index.return_value = MagicMock()
 
         job = IndexJob(
-            job_type="directory",
-            path=Path("/docs"),
-            collection_name="my-project",
-            indexer_type=IndexerType.PROJECT,
+            job_type=job_type,
+            path=path,
+            collection_name=f"my-{indexer_type}",
+            indexer_type=indexer_type,
         )
-        self._make_queue_and_process(job)
-        mock_proj.assert_called_once()
-
-    @patch("ragling.indexing_queue.init_db")
-    @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.git_indexer.GitRepoIndexer")
-    def test_routes_code(
-        self, mock_git: MagicMock, mock_conn: MagicMock, mock_init: MagicMock
-    ) -> None:
-        mock_conn.return_value = MagicMock()
-        mock_git.return_value.index.return_value = MagicMock()
-
-        job = IndexJob(
-            job_type="directory",
-            path=Path("/repo"),
-            collection_name="my-org",
-            indexer_type=IndexerType.CODE,
-        )
-        self._make_queue_and_process(job)
-        mock_git.assert_called_once()
+        with patch(target) as mock_indexer:
+            mock_indexer.return_value.index.return_value = MagicMock()
+            self._make_queue_and_process(job, tmp_path)
+        mock_indexer.assert_called_once()
 
     @patch("ragling.doc_store.DocStore")
     @patch("ragling.indexing_queue.init_db")
@@ -247,6 +369,7 @@ class TestProcessRouter:
         mock_conn: MagicMock,
         mock_init: MagicMock,
         mock_ds: MagicMock,
+        tmp_path: Path,
     ) -> None:
         """Code indexing should also run a document pass for non-code files."""
         from ragling.indexers.base import IndexResult
@@ -262,88 +385,12 @@ class TestProcessRouter:
             collection_name="my-org",
             indexer_type=IndexerType.CODE,
         )
-        self._make_queue_and_process(job)
+        self._make_queue_and_process(job, tmp_path)
 
         mock_git.assert_called_once()
         # ProjectIndexer should be instantiated for the document pass
         mock_proj.assert_called_once()
 
-    @patch("ragling.doc_store.DocStore")
-    @patch("ragling.indexing_queue.init_db")
-    @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.obsidian.ObsidianIndexer")
-    def test_routes_obsidian(
-        self, mock_obs: MagicMock, mock_conn: MagicMock, mock_init: MagicMock, mock_ds: MagicMock
-    ) -> None:
-        mock_conn.return_value = MagicMock()
-        mock_ds.return_value = MagicMock()
-        mock_obs.return_value.index.return_value = MagicMock()
-
-        job = IndexJob(
-            job_type="directory",
-            path=Path("/vault"),
-            collection_name="obsidian",
-            indexer_type=IndexerType.OBSIDIAN,
-        )
-        self._make_queue_and_process(job)
-        mock_obs.assert_called_once()
-
-    @patch("ragling.indexing_queue.init_db")
-    @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.email_indexer.EmailIndexer")
-    def test_routes_email(
-        self, mock_email: MagicMock, mock_conn: MagicMock, mock_init: MagicMock
-    ) -> None:
-        mock_conn.return_value = MagicMock()
-        mock_email.return_value.index.return_value = MagicMock()
-
-        job = IndexJob(
-            job_type="system_collection",
-            path=Path("/emclient"),
-            collection_name="email",
-            indexer_type=IndexerType.EMAIL,
-        )
-        self._make_queue_and_process(job)
-        mock_email.assert_called_once()
-
-    @patch("ragling.doc_store.DocStore")
-    @patch("ragling.indexing_queue.init_db")
-    @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.calibre_indexer.CalibreIndexer")
-    def test_routes_calibre(
-        self, mock_cal: MagicMock, mock_conn: MagicMock, mock_init: MagicMock, mock_ds: MagicMock
-    ) -> None:
-        mock_conn.return_value = MagicMock()
-        mock_ds.return_value = MagicMock()
-        mock_cal.return_value.index.return_value = MagicMock()
-
-        job = IndexJob(
-            job_type="system_collection",
-            path=None,
-            collection_name="calibre",
-            indexer_type=IndexerType.CALIBRE,
-        )
-        self._make_queue_and_process(job)
-        mock_cal.assert_called_once()
-
-    @patch("ragling.indexing_queue.init_db")
-    @patch("ragling.indexing_queue.get_connection")
-    @patch("ragling.indexers.rss_indexer.RSSIndexer")
-    def test_routes_rss(
-        self, mock_rss: MagicMock, mock_conn: MagicMock, mock_init: MagicMock
-    ) -> None:
-        mock_conn.return_value = MagicMock()
-        mock_rss.return_value.index.return_value = MagicMock()
-
-        job = IndexJob(
-            job_type="system_collection",
-            path=Path("/nnw"),
-            collection_name="rss",
-            indexer_type=IndexerType.RSS,
-        )
-        self._make_queue_and_process(job)
-        mock_rss.assert_called_once()
-
     @patch("ragling.indexers.base.delete_source")
     @patch("ragling.indexing_queue.get_or_create_collection")
     @patch("ragling.indexing_queue.init_db")
@@ -354,6 +401,7 @@ class TestProcessRouter:
         mock_init: MagicMock,
         mock_get_coll: MagicMock,
         mock_delete: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_get_coll.return_value = 42
@@ -364,10 +412,10 @@ class TestProcessRouter:
             collection_name="docs",
             indexer_type=IndexerType.PRUNE,
         )
-        self._make_queue_and_process(job)
+        self._make_queue_and_process(job, tmp_path)
         mock_delete.assert_called_once()
 
-    def test_unknown_indexer_type_raises(self) -> None:
+    def test_unknown_indexer_type_raises(self, tmp_path: Path) -> None:
         job = IndexJob(
             job_type="file",
             path=Path("/test"),
@@ -375,7 +423,7 @@ class TestProcessRouter:
             indexer_type="unknown_type",
         )
         with pytest.raises(ValueError, match="Unknown indexer_type"):
-            self._make_queue_and_process(job)
+            self._make_queue_and_process(job, tmp_path)
 
 
 class TestSubmitAndWait:
@@ -417,29 +465,10 @@ class TestSubmitAndWait:
             embedding_dimensions=4,
         )
         status = IndexingStatus()
+        # Worker never started: the job can't complete, so the wait times out
+        # deterministically without blocking on a real job
         queue = IndexingQueue(config, status)
-        queue.start()
-
-        # Block the worker with a slow job so our second job times out
-        slow_event = threading.Event()
-        original_process = queue._process
-
-        def _blocking_process(job: IndexJob) -> None:  # type: ignore[return]
-            slow_event.wait(timeout=10)
-            return original_process(job)
-
-        queue._process = _blocking_process  # type: ignore[assignment]
-
-        # Submit a blocker job first
-        blocker = IndexJob(
-            job_type="directory",
-            path=tmp_path,
-            collection_name="test-coll",
-            indexer_type=IndexerType.PROJECT,
-        )
-        queue.submit(blocker)
 
-        # Now submit our real job — it will queue behind the blocker
         job = IndexJob(
             job_type="directory",
             path=tmp_path,
@@ -447,12 +476,87 @@ class TestSubmitAndWait:
             indexer_type=IndexerType.PROJECT,
         )
 
-        result = queue.submit_and_wait(job, timeout=0.1)
+        result = queue.submit_and_wait(job, timeout=0)
         assert result is None
 
-        # Unblock the worker and shut down cleanly
-        slow_event.set()
-        queue.shutdown()
+
+class TestWorkerConnection:
+    """The worker reuses one index DB connection across jobs."""
+
+    def _prune_job(self, name: str) -> IndexJob:
+        return IndexJob(
+            job_type="file_deleted",
+            path=Path(f"/{name}.md"),
+            collection_name="docs",
+            indexer_type=IndexerType.PRUNE,
+        )
+
+    @patch("ragling.indexers.base.delete_source")
+    @patch("ragling.indexing_queue.get_or_create_collection")
+    @patch("ragling.indexing_queue.init_db")
+    @patch("ragling.indexing_queue.get_connection")
+    def test_connection_reused_until_config_changes(
+        self,
+        mock_conn: MagicMock,
+        mock_init: MagicMock,
+        mock_get_coll: MagicMock,
+        mock_delete: MagicMock,
+    ) -> None:
+        config = Config(embedding_dimensions=4)
+        q = IndexingQueue(config, IndexingStatus())
+
+        q._process(self._prune_job("a"))
+        q._process(self._prune_job("b"))
+        assert mock_conn.call_count == 1
+        assert mock_init.call_count == 1
+
+        q.set_config(config.with_overrides(embedding_dimensions=8))
+        q._process(self._prune_job("c"))
+        assert mock_conn.call_count == 2
+        # The connection opened under the old config was closed
+        assert mock_conn.return_value.close.call_count == 1
+
+    @patch("ragling.indexers.base.delete_source")
+    @patch("ragling.indexing_queue.get_or_create_collection")
+    @patch("ragling.indexing_queue.init_db")
+    @patch("ragling.indexing_queue.get_connection")
+    def test_failed_job_rolls_back(
+        self,
+        mock_conn: MagicMock,
+        mock_init: MagicMock,
+        mock_get_coll: MagicMock,
+        mock_delete: MagicMock,
+    ) -> None:
+        mock_delete.side_effect = RuntimeError("boom")
+        q = IndexingQueue(Config(embedding_dimensions=4), IndexingStatus())
+
+        with pytest.raises(RuntimeError):
+            q._process(self._prune_job("a"))
+
+        mock_conn.return_value.rollback.assert_called_once()
+        mock_conn.return_value.close.assert_not_called()
+
+    @pytest.mark.parametrize("in_transaction", [True, False])
+    @patch("ragling.indexers.base.delete_source")
+    @patch("ragling.indexing_queue.get_or_create_collection")
+    @patch("ragling.indexing_queue.init_db")
+    @patch("ragling.indexing_queue.get_connection")
+    def test_uncommitted_writes_rolled_back_after_job_returns(
+        self,
+        mock_conn: MagicMock,
+        mock_init: MagicMock,
+        mock_get_coll: MagicMock,
+        mock_delete: MagicMock,
+        in_transaction: bool,
+    ) -> None:
+        """Writes a job leaves uncommitted never reach the next job's commit."""
+        mock_conn.return_value.in_transaction = in_transaction
+        q = IndexingQueue(Config(embedding_dimensions=4), IndexingStatus())
+
+        q._process(self._prune_job("a"))
+
+        assert mock_conn.return_value.rollback.called is in_transaction
+        mock_conn.return_value.close.assert_not_called()
 
 
 class TestSetConfig:
@@ -527,7 +631,7 @@ class TestConcurrentSubmission:
 class TestIndexRequest:
     """Tests for the IndexRequest synchronous wrapper."""
 
-    def test_index_request_has_event_and_result(self) -> None:
+    def test_index_request_has_pending_future(self) -> None:
         job = IndexJob(
             job_type="directory",
             path=Path("/tmp/test"),
@@ -535,8 +639,7 @@ class TestIndexRequest:
             indexer_type=IndexerType.PROJECT,
         )
         request = IndexRequest(job=job)
-        assert not request.done.is_set()
-        assert request.result is None
+        assert not request.future.done()
 
 
 # ---------------------------------------------------------------------------
@@ -716,6 +819,7 @@ class TestStatusPassthrough:
         mock_conn: MagicMock,
         mock_init: MagicMock,
         mock_ds: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_ds.return_value = MagicMock()
@@ -724,7 +828,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -750,6 +854,7 @@ class TestStatusPassthrough:
         mock_conn: MagicMock,
         mock_init: MagicMock,
         mock_ds: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_ds.return_value = MagicMock()
@@ -758,7 +863,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -782,6 +887,7 @@ class TestStatusPassthrough:
         mock_email: MagicMock,
         mock_conn: MagicMock,
         mock_init: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_email.return_value.index.return_value = MagicMock()
@@ -789,7 +895,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -815,6 +921,7 @@ class TestStatusPassthrough:
         mock_conn: MagicMock,
         mock_init: MagicMock,
         mock_ds: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_ds.return_value = MagicMock()
@@ -823,7 +930,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -847,6 +954,7 @@ class TestStatusPassthrough:
         mock_rss: MagicMock,
         mock_conn: MagicMock,
         mock_init: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_rss.return_value.index.return_value = MagicMock()
@@ -854,7 +962,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -880,6 +988,7 @@ class TestStatusPassthrough:
         mock_conn: MagicMock,
         mock_init: MagicMock,
         mock_ds: MagicMock,
+        tmp_path: Path,
     ) -> None:
         mock_conn.return_value = MagicMock()
         mock_ds.return_value = MagicMock()
@@ -888,7 +997,7 @@ class TestStatusPassthrough:
         status = IndexingStatus()
         config = Config(
             embedding_dimensions=4,
-            shared_db_path=Path("/tmp/test_shared.db"),
+            shared_db_path=tmp_path / "doc_store.sqlite",
         )
         q = IndexingQueue(config, status)
 
@@ -1,24 +1,22 @@
 """Tests for ragling.indexing_status module."""
 
+import threading
+
+from ragling.indexing_status import _MAX_FAILURES_PER_COLLECTION, IndexingStatus
+
 
 class TestIndexingStatus:
     def test_initial_state_is_idle(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         assert status.is_active() is False
         assert status.to_dict() is None
 
     def test_increment_with_collection_makes_active(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         assert status.is_active() is True
 
     def test_increment_default_count(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("email")
         result = status.to_dict()
@@ -27,8 +25,6 @@ class TestIndexingStatus:
         assert result["collections"] == {"email": 1}
 
     def test_increment_with_count(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 5)
         result = status.to_dict()
@@ -37,8 +33,6 @@ class TestIndexingStatus:
         assert result["collections"] == {"obsidian": 5}
 
     def test_increment_multiple_collections(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 3)
         status.increment("email", 2)
@@ -49,8 +43,6 @@ class TestIndexingStatus:
         assert result["active"] is True
 
     def test_decrement_reduces_count(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 3)
         status.decrement("obsidian")
@@ -59,8 +51,6 @@ class TestIndexingStatus:
         assert result["collections"] == {"obsidian": 2}
 
     def test_decrement_to_zero_removes_collection(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("email")
         status.decrement("email")
@@ -68,8 +58,6 @@ class TestIndexingStatus:
         assert status.to_dict() is None
 
     def test_decrement_one_collection_leaves_others(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 2)
         status.increment("email", 1)
@@ -80,16 +68,12 @@ class TestIndexingStatus:
         assert result["total_remaining"] == 2
 
     def test_decrement_below_zero_clamps(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.decrement("obsidian")
         assert status.is_active() is False
         assert status.to_dict() is None
 
     def test_finish_resets_all_collections(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 10)
         status.increment("email", 5)
@@ -98,17 +82,11 @@ class TestIndexingStatus:
         assert status.to_dict() is None
 
     def test_to_dict_returns_none_when_idle(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         assert status.to_dict() is None
 
     def test_thread_safety(self) -> None:
         """Multiple threads can safely update per-collection counters."""
-        import threading
-
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian", 500)
         status.increment("email", 500)
@@ -135,8 +113,6 @@ class TestFileLevelStatus:
     """Tests for file-level indexing progress."""
 
     def test_set_file_total_and_processed(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 100)
         status.file_processed("obsidian", 55)
@@ -149,8 +125,6 @@ class TestFileLevelStatus:
         assert result["total_remaining"] == 45
 
     def test_file_counts_replace_job_counts_when_present(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")  # job-level: 1 remaining
         status.set_file_total("obsidian", 50)  # file-level: 50 remaining
@@ -162,8 +136,6 @@ class TestFileLevelStatus:
 
     def test_mixed_file_and_job_level_total_remaining(self) -> None:
         """total_remaining aggregates across file-level and job-level collections."""
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         # Add job-level counts for email
         status.increment("email", 2)
@@ -184,8 +156,6 @@ class TestFileLevelStatus:
         assert result["collections"]["obsidian"]["remaining"] == 40
 
     def test_to_dict_shape(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("email", 30)
         status.file_processed("email", 30)
@@ -204,29 +174,21 @@ class TestIsCollectionActive:
     """Tests for is_collection_active method."""
 
     def test_inactive_when_empty(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         assert status.is_collection_active("obsidian") is False
 
     def test_active_with_job_count(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         assert status.is_collection_active("obsidian") is True
         assert status.is_collection_active("email") is False
 
     def test_active_with_file_counts(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 100)
         assert status.is_collection_active("obsidian") is True
 
     def test_inactive_after_decrement_to_zero(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         status.decrement("obsidian")
@@ -237,8 +199,6 @@ class TestByteTracking:
     """Tests for byte-level tracking in IndexingStatus."""
 
     def test_set_file_total_stores_total_bytes(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 50, total_bytes=1_000_000)
 
@@ -248,8 +208,6 @@ class TestByteTracking:
         assert result["collections"]["obsidian"]["remaining_bytes"] == 1_000_000
 
     def test_set_file_total_defaults_bytes_to_zero(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("email", 30)
 
@@ -259,8 +217,6 @@ class TestByteTracking:
         assert result["collections"]["email"]["remaining_bytes"] == 0
 
     def test_file_processed_decrements_remaining_bytes(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 10, total_bytes=500_000)
         status.file_processed("obsidian", 3, file_bytes=150_000)
@@ -270,8 +226,6 @@ class TestByteTracking:
         assert result["collections"]["obsidian"]["remaining_bytes"] == 350_000
 
     def test_to_dict_includes_total_remaining_bytes(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 50, total_bytes=1_000_000)
         status.file_processed("obsidian", 10, file_bytes=200_000)
@@ -283,8 +237,6 @@ class TestByteTracking:
 
     def test_to_dict_total_remaining_bytes_excludes_job_level(self) -> None:
         """Job-level collections don't contribute to total_remaining_bytes."""
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("email", 2)  # job-level, no bytes
         status.set_file_total("obsidian", 50, total_bytes=1_000_000)
@@ -295,8 +247,6 @@ class TestByteTracking:
 
     def test_decrement_clears_file_level_data(self) -> None:
         """When decrement clears a collection, file-level data is also cleared."""
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         status.set_file_total("obsidian", 50, total_bytes=1_000_000)
@@ -310,8 +260,6 @@ class TestByteTracking:
 
     def test_mixed_byte_and_no_byte_collections(self) -> None:
         """Collections with and without bytes work together correctly."""
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.set_file_total("obsidian", 100, total_bytes=5_000_000)
         status.file_processed("obsidian", 40, file_bytes=2_000_000)
@@ -332,8 +280,6 @@ class TestFailureTracking:
     """Tests for failure tracking in IndexingStatus."""
 
     def test_record_failure_stores_message(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.record_failure("obsidian", "Failed to embed document.md")
         result = status.to_dict()
@@ -347,8 +293,6 @@ class TestFailureTracking:
         assert result["failures"]["obsidian"] == ["Failed to embed document.md"]
 
     def test_record_multiple_failures(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         status.record_failure("obsidian", "Error 1")
@@ -357,9 +301,19 @@ class TestFailureTracking:
         assert result is not None
         assert result["failures"]["obsidian"] == ["Error 1", "Error 2"]
 
-    def test_failures_across_collections(self) -> None:
-        from ragling.indexing_status import IndexingStatus
+    def test_failures_keep_only_most_recent(self) -> None:
+        status = IndexingStatus()
+        status.increment("obsidian")
+        for i in range(_MAX_FAILURES_PER_COLLECTION + 5):
+            status.record_failure("obsidian", f"Error {i}")
+        result = status.to_dict()
+        assert result is not None
+        failures = result["failures"]["obsidian"]
+        assert len(failures) == _MAX_FAILURES_PER_COLLECTION
+        assert failures[0] == "Error 5"
+        assert failures[-1] == f"Error {_MAX_FAILURES_PER_COLLECTION + 4}"
 
+    def test_failures_across_collections(self) -> None:
         status = IndexingStatus()
         status.increment("obsidian")
         status.increment("email")
@@ -371,8 +325,6 @@ class TestFailureTracking:
         assert result["failures"]["email"] == ["Email error"]
 
     def test_no_failures_key_when_empty(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         result = status.to_dict()
@@ -380,8 +332,6 @@ class TestFailureTracking:
         assert "failures" not in result
 
     def test_finish_clears_failures(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         status.record_failure("obsidian", "Some error")
@@ -389,8 +339,6 @@ class TestFailureTracking:
         assert status.to_dict() is None
 
     def test_decrement_clears_collection_failures(self) -> None:
-        from ragling.indexing_status import IndexingStatus
-
         status = IndexingStatus()
         status.increment("obsidian")
         status.record_failure("obsidian", "Some error")
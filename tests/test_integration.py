@@ -7,18 +7,24 @@ embedding → DB → search → results.
 
 import sqlite3
 import threading
+from collections.abc import Iterator
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from tests.helpers import make_test_config, make_test_conn
+from ragling.auth.auth import resolve_api_key
 from ragling.config import Config, UserConfig
+from ragling.document.chunker import Chunk
+from ragling.db import get_connection, get_or_create_collection, init_db
 from ragling.doc_store import DocStore
+from ragling.indexers.base import upsert_source_with_chunks
+from ragling.indexers.project import ProjectIndexer
+from ragling.search.search import SearchResult, search
 
 # Skip if sqlite-vec not available
-_conn = sqlite3.connect(":memory:")
-_has_load_extension = hasattr(_conn, "enable_load_extension")
-_conn.close()
+_has_load_extension = hasattr(sqlite3.Connection, "enable_load_extension")
 
 requires_sqlite_extensions = pytest.mark.skipif(
     not _has_load_extension,
@@ -26,115 +32,109 @@ requires_sqlite_extensions = pytest.mark.skipif(
 )
 
 
+@pytest.fixture(scope="module")
+def scoped_search(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Iterator[tuple[sqlite3.Connection, Config, list[str]]]:
+    """Index kitchen, garage and global docs once and resolve the kitchen user.
+
+    Yields ``(conn, config, visible)`` where *visible* is the kitchen user's
+    visible collections. Shared by every test in the module that needs it.
+    """
+
+    tmp_path = tmp_path_factory.mktemp("full_flow")
+
+    # Setup directories
+    home = tmp_path / "groups"
+    global_dir = tmp_path / "global"
+    (home / "kitchen").mkdir(parents=True)
+    (home / "garage").mkdir(parents=True)
+    global_dir.mkdir()
+
+    # Create files
+    (home / "kitchen" / "recipe.md").write_text("# Pasta Recipe\n\nCook the pasta.")
+    (home / "garage" / "tools.md").write_text("# Garage Tools\n\nHammer and nails.")
+    (global_dir / "rules.md").write_text("# House Rules\n\nBe kind to each other.")
+
+    # Config
+    config = make_test_config(
+        tmp_path,
+        home=home,
+        global_paths=[global_dir],
+        users={
+            "kitchen": UserConfig(api_key="rag_kitchen"),
+            "garage": UserConfig(api_key="rag_garage"),
+        },
+        shared_db_path=tmp_path / "doc_store.sqlite",
+    )
+    conn = make_test_conn(tmp_path)
+
+    # Index one file per collection with fixed 4d vectors
+    docs = [
+        ("kitchen", home / "kitchen" / "recipe.md", "Cook the pasta.", "Pasta Recipe"),
+        ("garage", home / "garage" / "tools.md", "Hammer and nails.", "Garage Tools"),
+        ("global", global_dir / "rules.md", "Be kind to each other.", "House Rules"),
+    ]
+    embeddings = [[1.0, 0.0, 0.0, 0.0], [0.9, 0.1, 0.0, 0.0], [0.8, 0.2, 0.0, 0.0]]
+    for (name, path, text, title), embedding in zip(docs, embeddings, strict=True):
+        upsert_source_with_chunks(
+            conn,
+            collection_id=get_or_create_collection(conn, name, "project"),
+            source_path=str(path),
+            source_type="markdown",
+            chunks=[Chunk(text=text, title=title, chunk_index=0)],
+            embeddings=[embedding],
+            file_hash=f"{name}-hash",
+        )
+
+    # Resolve kitchen user
+    user_ctx = resolve_api_key("rag_kitchen", config)
+    assert user_ctx is not None
+    visible = user_ctx.visible_collections(global_collection="global")
+
+    yield conn, config, visible
+    conn.close()
+
+
 @requires_sqlite_extensions
 class TestFullFlow:
     """End-to-end test: config -> index -> search with user scoping."""
 
-    def test_user_sees_own_and_global_content_only(self, tmp_path: Path) -> None:
-        """Kitchen user searches and sees kitchen + global docs, not garage docs."""
-        # Setup directories
-        home = tmp_path / "groups"
-        global_dir = tmp_path / "global"
-        (home / "kitchen").mkdir(parents=True)
-        (home / "garage").mkdir(parents=True)
-        global_dir.mkdir()
-
-        # Create files
-        (home / "kitchen" / "recipe.md").write_text("# Pasta Recipe\n\nCook the pasta.")
-        (home / "garage" / "tools.md").write_text("# Garage Tools\n\nHammer and nails.")
-        (global_dir / "rules.md").write_text("# House Rules\n\nBe kind to each other.")
-
-        # Config
-        config = Config(
-            home=home,
-            global_paths=[global_dir],
-            users={
-                "kitchen": UserConfig(api_key="rag_kitchen"),
-                "garage": UserConfig(api_key="rag_garage"),
-            },
-            db_path=tmp_path / "test.db",
-            shared_db_path=tmp_path / "doc_store.sqlite",
-            embedding_dimensions=4,
+    @staticmethod
+    def _kitchen_result_collections(
+        scoped_search: tuple[sqlite3.Connection, Config, list[str]],
+    ) -> set[str]:
+        """Search everything as the kitchen user and return the hit collections."""
+
+        conn, config, visible = scoped_search
+        results = search(
+            conn=conn,
+            query_embedding=[1.0, 0.0, 0.0, 0.0],
+            query_text="pasta tools rules",
+            top_k=10,
+            filters=None,
+            config=config,
+            visible_collections=visible,
         )
+        return {r.collection for r in results}
 
-        # Mock embeddings (return fixed 4d vectors)
-        mock_embeddings = [[1.0, 0.0, 0.0, 0.0]]
-
-        with patch("ragling.embeddings.get_embeddings", return_value=mock_embeddings):
-            with patch("ragling.embeddings.get_embedding", return_value=[1.0, 0.0, 0.0, 0.0]):
-                from ragling.auth.auth import resolve_api_key
-                from ragling.document.chunker import Chunk
-                from ragling.db import get_connection, get_or_create_collection, init_db
-                from ragling.indexers.base import upsert_source_with_chunks
-                from ragling.search.search import search
-
-                conn = get_connection(config)
-                init_db(conn, config)
-
-                # Index kitchen file
-                kitchen_id = get_or_create_collection(conn, "kitchen", "project")
-                upsert_source_with_chunks(
-                    conn,
-                    collection_id=kitchen_id,
-                    source_path=str(home / "kitchen" / "recipe.md"),
-                    source_type="markdown",
-                    chunks=[Chunk(text="Cook the pasta.", title="Pasta Recipe", chunk_index=0)],
-                    embeddings=[[1.0, 0.0, 0.0, 0.0]],
-                    file_hash="abc123",
-                )
-
-                # Index garage file
-                garage_id = get_or_create_collection(conn, "garage", "project")
-                upsert_source_with_chunks(
-                    conn,
-                    collection_id=garage_id,
-                    source_path=str(home / "garage" / "tools.md"),
-                    source_type="markdown",
-                    chunks=[Chunk(text="Hammer and nails.", title="Garage Tools", chunk_index=0)],
-                    embeddings=[[0.9, 0.1, 0.0, 0.0]],
-                    file_hash="def456",
-                )
-
-                # Index global file
-                global_id = get_or_create_collection(conn, "global", "project")
-                upsert_source_with_chunks(
-                    conn,
-                    collection_id=global_id,
-                    source_path=str(global_dir / "rules.md"),
-                    source_type="markdown",
-                    chunks=[
-                        Chunk(
-                            text="Be kind to each other.",
-                            title="House Rules",
-                            chunk_index=0,
-                        )
-                    ],
-                    embeddings=[[0.8, 0.2, 0.0, 0.0]],
-                    file_hash="ghi789",
-                )
-
-                # Resolve kitchen user
-                user_ctx = resolve_api_key("rag_kitchen", config)
-                assert user_ctx is not None
-                visible = user_ctx.visible_collections(global_collection="global")
-
-                # Search as kitchen user
-                results = search(
-                    conn=conn,
-                    query_embedding=[1.0, 0.0, 0.0, 0.0],
-                    query_text="pasta tools rules",
-                    top_k=10,
-                    filters=None,
-                    config=config,
-                    visible_collections=visible,
-                )
-
-                collections_in_results = {r.collection for r in results}
-                assert "kitchen" in collections_in_results
-                assert "global" in collections_in_results
-                assert "garage" not in collections_in_results
-
-                conn.close()
+    def test_user_sees_own_content(
+        self, scoped_search: tuple[sqlite3.Connection, Config, list[str]]
+    ) -> None:
+        """Kitchen user's search returns kitchen docs."""
+        assert "kitchen" in self._kitchen_result_collections(scoped_search)
+
+    def test_user_sees_global_content(
+        self, scoped_search: tuple[sqlite3.Connection, Config, list[str]]
+    ) -> None:
+        """Kitchen user's search returns global docs."""
+        assert "global" in self._kitchen_result_collections(scoped_search)
+
+    def test_user_does_not_see_other_group_content(
+        self, scoped_search: tuple[sqlite3.Connection, Config, list[str]]
+    ) -> None:
+        """Kitchen user's search never returns garage docs."""
+        assert "garage" not in self._kitchen_result_collections(scoped_search)
 
 
 @requires_sqlite_extensions
@@ -185,7 +185,6 @@ class TestMultiGroupDocSharing:
         assert "beta" in str(config_beta.group_index_db_path)
 
         # Create actual per-group index DBs to confirm isolation
-        from ragling.db import get_connection, init_db
 
         conn_alpha = get_connection(config_alpha)
         init_db(conn_alpha, config_alpha)
@@ -321,11 +320,6 @@ class TestFullPipelineEndToEnd:
 
     def test_index_and_search_text_file(self, tmp_path: Path) -> None:
         """Index a .txt file via ProjectIndexer, then find it via hybrid search."""
-        from ragling.document.chunker import Chunk
-        from ragling.config import Config
-        from ragling.db import get_connection, init_db
-        from ragling.indexers.project import ProjectIndexer
-        from ragling.search.search import SearchResult, search
 
         # 1. Create a text file on disk
         doc_dir = tmp_path / "docs"
@@ -337,15 +331,10 @@ class TestFullPipelineEndToEnd:
         )
 
         # 2. Configure with small embedding dimensions for testing
-        config = Config(
-            db_path=tmp_path / "test.db",
-            embedding_dimensions=4,
-            chunk_size_tokens=256,
-        )
+        config = make_test_config(tmp_path, chunk_size_tokens=256)
 
-        # 3. Set up real DB
-        conn = get_connection(config)
-        init_db(conn, config)
+        # 3. Set up real DB from the shared schema template
+        conn = make_test_conn(tmp_path)
 
         # 4. Fixed embedding vectors
         fixed_embedding = [0.5, 0.3, 0.1, 0.8]
@@ -367,7 +356,7 @@ class TestFullPipelineEndToEnd:
                 ],
             ),
             patch(
-                "ragling.indexers.project.get_embeddings",
+                "ragling.indexers.base.get_embeddings",
                 return_value=[fixed_embedding],
             ),
         ):
@@ -420,11 +409,6 @@ class TestFullPipelineEndToEnd:
 
     def test_index_multiple_files_and_search(self, tmp_path: Path) -> None:
         """Index multiple files and verify search returns the most relevant one."""
-        from ragling.document.chunker import Chunk
-        from ragling.config import Config
-        from ragling.db import get_connection, init_db
-        from ragling.indexers.project import ProjectIndexer
-        from ragling.search.search import search
 
         doc_dir = tmp_path / "docs"
         doc_dir.mkdir()
@@ -435,14 +419,9 @@ class TestFullPipelineEndToEnd:
         file_b = doc_dir / "astronomy.txt"
         file_b.write_text("The Andromeda galaxy is the nearest spiral galaxy.")
 
-        config = Config(
-            db_path=tmp_path / "test.db",
-            embedding_dimensions=4,
-            chunk_size_tokens=256,
-        )
+        config = make_test_config(tmp_path, chunk_size_tokens=256)
 
-        conn = get_connection(config)
-        init_db(conn, config)
+        conn = make_test_conn(tmp_path)
 
         # Give the cooking doc a vector closer to the query vector
         cooking_embedding = [0.9, 0.1, 0.0, 0.0]
@@ -491,7 +470,7 @@ class TestFullPipelineEndToEnd:
                 side_effect=mock_parse_and_chunk,
             ),
             patch(
-                "ragling.indexers.project.get_embeddings",
+                "ragling.indexers.base.get_embeddings",
                 side_effect=mock_get_embeddings,
             ),
         ):
@@ -500,6 +479,8 @@ class TestFullPipelineEndToEnd:
 
         assert result.indexed == 2
         assert result.errors == 0
+        # Both files' chunks were embedded with a single call
+        assert len(embed_calls) == 1
 
         # Verify both documents are in the DB
         doc_count = conn.execute("SELECT COUNT(*) AS cnt FROM documents").fetchone()["cnt"]
@@ -524,25 +505,15 @@ class TestFullPipelineEndToEnd:
 
     def test_reindex_updates_content(self, tmp_path: Path) -> None:
         """Re-indexing a modified file replaces old content in the DB."""
-        from ragling.document.chunker import Chunk
-        from ragling.config import Config
-        from ragling.db import get_connection, init_db
-        from ragling.indexers.project import ProjectIndexer
-        from ragling.search.search import search
 
         doc_dir = tmp_path / "docs"
         doc_dir.mkdir()
         test_file = doc_dir / "evolving.txt"
         test_file.write_text("Original content about quantum computing.")
 
-        config = Config(
-            db_path=tmp_path / "test.db",
-            embedding_dimensions=4,
-            chunk_size_tokens=256,
-        )
+        config = make_test_config(tmp_path, chunk_size_tokens=256)
 
-        conn = get_connection(config)
-        init_db(conn, config)
+        conn = make_test_conn(tmp_path)
 
         embedding = [0.5, 0.5, 0.0, 0.0]
 
@@ -559,7 +530,7 @@ class TestFullPipelineEndToEnd:
                 ],
             ),
             patch(
-                "ragling.indexers.project.get_embeddings",
+                "ragling.indexers.base.get_embeddings",
                 return_value=[embedding],
             ),
         ):
@@ -584,7 +555,7 @@ class TestFullPipelineEndToEnd:
                 ],
             ),
             patch(
-                "ragling.indexers.project.get_embeddings",
+                "ragling.indexers.base.get_embeddings",
                 return_value=[embedding],
             ),
         ):
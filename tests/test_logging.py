@@ -40,7 +40,7 @@ class TestProjectIndexerLogging:
 
         with (
             patch("ragling.indexers.format_routing.chunk_with_hybrid") as mock_hybrid,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_hybrid.return_value = [Chunk(text="text", title="note.md", chunk_index=0)]
             mock_embed.return_value = [[0.1] * 1024]
@@ -434,7 +434,7 @@ class TestProjectIndexerRepoDocuments:
 
         with (
             patch("ragling.indexers.project.parse_and_chunk") as mock_parse,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_parse.return_value = [
                 Chunk(text="Specification details", title="spec.md", chunk_index=0)
@@ -495,7 +495,7 @@ class TestBackwardCompatibility:
 
         with (
             patch("ragling.indexers.project.parse_and_chunk") as mock_parse,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_parse.return_value = [Chunk(text="text", title="test", chunk_index=0)]
             mock_embed.return_value = [[0.1, 0.2, 0.3, 0.4]]
@@ -531,7 +531,7 @@ class TestBackwardCompatibility:
 
         with (
             patch("ragling.indexers.project.parse_and_chunk") as mock_parse,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_parse.return_value = [Chunk(text="text", title="report", chunk_index=0)]
             mock_embed.return_value = [[0.1, 0.2, 0.3, 0.4]]
@@ -578,7 +578,7 @@ class TestProjectIndexerStatusReporting:
 
         with (
             patch("ragling.indexers.project.parse_and_chunk") as mock_parse,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_parse.return_value = [Chunk(text="text", title="test", chunk_index=0)]
             mock_embed.return_value = [[0.1, 0.2, 0.3, 0.4]]
@@ -609,7 +609,7 @@ class TestProjectIndexerStatusReporting:
 
         with (
             patch("ragling.indexers.project.parse_and_chunk") as mock_parse,
-            patch("ragling.indexers.project.get_embeddings") as mock_embed,
+            patch("ragling.indexers.base.get_embeddings") as mock_embed,
         ):
             mock_parse.return_value = [Chunk(text="text", title="test", chunk_index=0)]
             mock_embed.return_value = [[0.1, 0.2, 0.3, 0.4]]
@@ -620,6 +620,58 @@ class TestProjectIndexerStatusReporting:
         conn.close()
 
 
+class TestProjectIndexerEmbedBatching:
+    """Tests for embedding chunks from several files in one call."""
+
+    def _setup(self, tmp_path: Path) -> tuple:
+        from ragling.db import get_connection, init_db
+
+        config = Config(
+            db_path=tmp_path / "test.db",
+            embedding_dimensions=4,
+            chunk_size_tokens=256,
+        )
+        conn = get_connection(config)
+        init_db(conn, config)
+
+        project_dir = tmp_path / "docs"
+        project_dir.mkdir()
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (project_dir / name).write_text(f"{name} content")
+        return conn, config, project_dir
+
+    @staticmethod
+    def _parse(path: Path, *args, **kwargs) -> list[Chunk]:  # type: ignore[no-untyped-def]
+        return [
+            Chunk(text=f"{path.name} chunk {i}", title=path.name, chunk_index=i) for i in range(2)
+        ]
+
+    def test_files_share_one_embedding_call(self, tmp_path: Path) -> None:
+        """Chunks from every changed file are embedded together, in file order."""
+        from ragling.indexers.project import ProjectIndexer
+
+        conn, config, project_dir = self._setup(tmp_path)
+        embed_calls: list[list[str]] = []
+
+        def fake_embed(texts: list[str], config: Config) -> list[list[float]]:
+            embed_calls.append(texts)
+            return [[0.1, 0.2, 0.3, 0.4] for _ in texts]
+
+        with (
+            patch("ragling.indexers.project.parse_and_chunk", side_effect=self._parse),
+            patch("ragling.indexers.base.get_embeddings", side_effect=fake_embed),
+        ):
+            result = ProjectIndexer("batched", [project_dir]).index(conn, config)
+
+        assert result.indexed == 3
+        assert embed_calls == [
+            [f"{name} chunk {i}" for name in ("a.txt", "b.txt", "c.txt") for i in range(2)]
+        ]
+        vec_count = conn.execute("SELECT COUNT(*) FROM vec_documents").fetchone()[0]
+        assert vec_count == 6
+        conn.close()
+
+
 class TestSpecMdRouting:
     """Tests for SPEC.md files being routed to the spec parser."""
 
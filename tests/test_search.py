@@ -20,9 +20,7 @@ from ragling.search.search import (
 )
 
 # Check if sqlite3 supports loading extensions (required for sqlite-vec integration tests)
-_conn = sqlite3.connect(":memory:")
-_has_load_extension = hasattr(_conn, "enable_load_extension")
-_conn.close()
+_has_load_extension = hasattr(sqlite3.Connection, "enable_load_extension")
 
 requires_sqlite_extensions = pytest.mark.skipif(
     not _has_load_extension,
@@ -300,7 +298,7 @@ class TestSearchWithDatabase:
 
         query_blob = serialize_float32([0.9, 0.1, 0.0, 0.0])
         rows = conn.execute(
-            "SELECT document_id, distance FROM vec_documents WHERE embedding MATCH ? ORDER BY distance LIMIT 2",
+            "SELECT document_id, distance FROM vec_documents WHERE embedding MATCH ? AND k = 2 ORDER BY distance",
             (query_blob,),
         ).fetchall()
 